@@ -1,11 +1,1365 @@
+import asyncio
+import bisect
+import contextvars
+import copy
+import fnmatch
+import functools
+import heapq
+import random
+import re
+import time
+import weakref
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
 from ErisPulse.Core.Bases import BaseModule
 from ErisPulse.Core.Event import command
 
 
+def parse_options(args, value_options=(), flag_options=()):
+    """
+    从命令参数中拆分出选项
+    
+    :param args: 命令参数列表
+    :param value_options: 带值的选项名（如 "--page"）
+    :param flag_options: 布尔开关选项名（如 "--all"）
+    :return: (位置参数列表, 选项字典)
+    :raises ValueError: 带值选项缺少取值时
+    """
+    positional = []
+    options = {}
+    i = 0
+    while i < len(args):
+        arg = args[i]
+        name, sep, inline_value = arg.partition("=")
+        if name in value_options:
+            if sep:
+                options[name] = inline_value
+            elif i + 1 < len(args):
+                i += 1
+                options[name] = args[i]
+            else:
+                raise ValueError(f"选项 {name} 缺少取值")
+        elif arg in flag_options:
+            options[arg] = True
+        else:
+            positional.append(arg)
+        i += 1
+    return positional, options
+
+
+def parse_value(value_str):
+    """解析命令中的值，以 { 或 [ 开头时尝试按 JSON 解析"""
+    if value_str.startswith("{") or value_str.startswith("["):
+        import json
+        try:
+            return json.loads(value_str)
+        except json.JSONDecodeError:
+            pass
+    return value_str
+
+
+def format_value(value):
+    """格式化配置/存储值用于回复"""
+    if value is None:
+        return "值: (未设置)"
+    if isinstance(value, (dict, list)):
+        import json
+        return f"值:\n{json.dumps(value, indent=2, ensure_ascii=False)}"
+    return f"值: {value}"
+
+
+_CONFIG_PATH_TOKEN = re.compile(r"([^.\[\]]+)|\[(-?\d+)\]")
+
+
+def parse_config_path(path):
+    """
+    解析配置路径，如 ``Adapter.servers[2].port``
+    
+    :return: (配置键, 剩余路径)；配置键为第一个列表下标之前的点分路径，可直接交给 config，
+        剩余路径为 str（字典键）与 int（列表下标）组成的列表
+    :raises ValueError: 路径格式无效
+    """
+    parts = []
+    pos = 0
+    while pos < len(path):
+        match = _CONFIG_PATH_TOKEN.match(path, pos)
+        if match is None:
+            raise ValueError(f"无效的配置路径: {path}")
+        name, index = match.groups()
+        parts.append(name if name is not None else int(index))
+        pos = match.end()
+        if pos < len(path) and path[pos] == ".":
+            pos += 1
+            if pos == len(path):
+                raise ValueError(f"无效的配置路径: {path}")
+    if not parts or not isinstance(parts[0], str):
+        raise ValueError(f"无效的配置路径: {path}")
+    
+    split = next((i for i, part in enumerate(parts) if isinstance(part, int)), len(parts))
+    return ".".join(parts[:split]), parts[split:]
+
+
+def resolve_path(value, parts, default=None):
+    """沿剩余路径取值，任一层不存在时返回 default"""
+    for part in parts:
+        if isinstance(part, int):
+            if not isinstance(value, list) or not -len(value) <= part < len(value):
+                return default
+        elif not isinstance(value, dict) or part not in value:
+            return default
+        value = value[part]
+    return value
+
+
+def update_path(node, parts, func):
+    """
+    以 func 的返回值替换剩余路径处的值，缺失的字典层级自动创建
+    
+    :return: 更新后的 node
+    :raises KeyError: 列表下标越界或路径穿过非容器值
+    """
+    if not parts:
+        return func(node)
+    head = parts[0]
+    if isinstance(head, int):
+        if not isinstance(node, list) or not -len(node) <= head < len(node):
+            raise KeyError(f"下标 [{head}] 不存在")
+        node[head] = update_path(node[head], parts[1:], func)
+        return node
+    if node is None:
+        node = {}
+    if not isinstance(node, dict):
+        raise KeyError(f"'{head}' 的上一级不是对象")
+    node[head] = update_path(node.get(head), parts[1:], func)
+    return node
+
+
+def merge_patch(target, patch):
+    """按 JSON Merge Patch（RFC 7386）将 patch 合并到 target，值为 null 的字段被删除"""
+    if not isinstance(patch, dict):
+        return patch
+    if not isinstance(target, dict):
+        target = {}
+    for key, value in patch.items():
+        if value is None:
+            target.pop(key, None)
+        else:
+            target[key] = merge_patch(target.get(key), value)
+    return target
+
+
+def encode_cursor(position, key):
+    """将存储键列表中的位置与该位置前的最后一个键编码为续页令牌"""
+    import base64
+    import json
+    raw = json.dumps([position, key], ensure_ascii=False).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token):
+    """
+    解析续页令牌
+    
+    :return: (位置, 最后一个键)
+    :raises ValueError: 令牌无效
+    """
+    import base64
+    import binascii
+    import json
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        position, key = json.loads(raw.decode("utf-8"))
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise ValueError("无效的续页令牌")
+    if not isinstance(position, int) or position < 0 or not isinstance(key, str):
+        raise ValueError("无效的续页令牌")
+    return position, key
+
+
+def compile_key_matcher(pattern):
+    """将前缀或通配符模式编译为键匹配函数，无模式时返回 None"""
+    if not pattern:
+        return None
+    if any(c in pattern for c in "*?["):
+        return re.compile(fnmatch.translate(pattern)).match
+    return lambda key: key.startswith(pattern)
+
+
+def open_jsonl(path, mode, compress=False):
+    """
+    打开 JSONL 文件
+    
+    写入时 compress 为 True 则使用 gzip；读取时根据文件头自动识别 gzip。
+    """
+    import gzip
+    if mode == "r":
+        with open(path, "rb") as f:
+            compress = f.read(2) == b"\x1f\x8b"
+    if compress:
+        return gzip.open(path, mode + "t", encoding="utf-8")
+    return open(path, mode, encoding="utf-8")
+
+
+def write_jsonl_batch(f, items):
+    """
+    将一批键值对写为 JSONL 行
+    
+    :return: (写入条数, 因无法序列化而跳过的条数)
+    """
+    import json
+    lines = []
+    skipped = 0
+    for key, value in items:
+        try:
+            lines.append(json.dumps({"key": key, "value": value}, ensure_ascii=False))
+        except (TypeError, ValueError):
+            skipped += 1
+    if lines:
+        f.write("\n".join(lines) + "\n")
+    return len(lines), skipped
+
+
+def read_jsonl_batch(f, size):
+    """
+    从 JSONL 文件读取至多 size 行
+    
+    :return: ([(键, 值), ...], 无效行数, 是否已读到文件末尾)
+    """
+    import json
+    records = []
+    invalid = 0
+    for _ in range(size):
+        line = f.readline()
+        if not line:
+            return records, invalid, True
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+            records.append((record["key"], record["value"]))
+        except (ValueError, KeyError, TypeError):
+            invalid += 1
+    return records, invalid, False
+
+
+# 角色及其级别，高级别包含低级别的全部权限
+ROLE_LEVELS = {"viewer": 1, "operator": 2, "owner": 3}
+
+
+class PermissionMatrix:
+    """
+    角色权限矩阵
+    
+    将管理员列表与角色规则预编译为 {(用户ID/群组ID, 生效群组): {命令组: 级别}}，
+    每次检查只做固定次数的字典查找，与规则数量无关。管理员列表中的 ID 在所有命令组中均为 owner。
+    
+    角色规则格式::
+    
+        {"role": "operator", "ids": ["123"], "command_groups": ["module"], "group_id": "456"}
+    
+    command_groups 省略时对所有命令组生效；group_id 省略时在任意会话中生效，
+    否则仅在该群组中生效。ids 中的群组ID 对群内所有成员生效。
+    """
+
+    __slots__ = ("_grants", "public_read", "errors", "rules")
+
+    def __init__(self, admins, rules, command_groups, public_read=False):
+        self.public_read = public_read
+        self.errors = []
+        self.rules = 0
+        grants = {}
+        
+        def grant(subject, where, scopes, level):
+            levels = grants.setdefault((str(subject), where), {})
+            for scope in scopes:
+                if levels.get(scope, 0) < level:
+                    levels[scope] = level
+        
+        command_groups = tuple(command_groups)
+        for admin_id in admins:
+            grant(admin_id, "*", command_groups, ROLE_LEVELS["owner"])
+        
+        for i, rule in enumerate(rules or []):
+            try:
+                level = ROLE_LEVELS[rule["role"]]
+                ids = rule["ids"]
+                scopes = rule.get("command_groups") or command_groups
+            except (KeyError, TypeError) as e:
+                self.errors.append(f"第 {i + 1} 条角色规则无效: 缺少或错误的字段 {e}")
+                continue
+            if isinstance(ids, (str, int)):
+                ids = [ids]
+            if isinstance(scopes, str):
+                scopes = [scopes]
+            unknown = [scope for scope in scopes if scope not in command_groups]
+            if unknown:
+                self.errors.append(f"第 {i + 1} 条角色规则无效: 未知的命令组 {', '.join(unknown)}")
+                continue
+            where = str(rule["group_id"]) if rule.get("group_id") else "*"
+            for subject in ids:
+                # 群组ID 限定在自身群组中生效，等价于不限定
+                grant(subject, "*" if str(subject) == where else where, scopes, level)
+            self.rules += 1
+        
+        self._grants = grants
+
+    def __len__(self):
+        return len(self._grants)
+
+    def level(self, user_id, group_id, command_group):
+        """用户在当前会话中对该命令组的最高角色级别，无角色时为 0"""
+        grants = self._grants
+        best = 0
+        if user_id:
+            user_id = str(user_id)
+            levels = grants.get((user_id, "*"))
+            if levels:
+                best = levels.get(command_group, 0)
+        if group_id:
+            group_id = str(group_id)
+            for key in ((group_id, "*"), (user_id, group_id)) if user_id else ((group_id, "*"),):
+                levels = grants.get(key)
+                if levels:
+                    best = max(best, levels.get(command_group, 0))
+        return best
+
+    def allows(self, user_id, group_id, command_group, role):
+        """检查是否具有不低于 role 的角色；public_read 时 viewer 级别对所有人开放"""
+        required = ROLE_LEVELS[role]
+        if required == ROLE_LEVELS["viewer"] and self.public_read:
+            return True
+        return self.level(user_id, group_id, command_group) >= required
+
+
+def normalize_package_name(name):
+    """按 PEP 503 规范化包名"""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+_REQUIREMENT_NAME = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)")
+
+
+def _requirement_names(dist):
+    """提取发行包的运行时依赖包名（忽略 extra 依赖）"""
+    names = []
+    for requirement in getattr(dist, "requires", None) or []:
+        if re.search(r"extra\s*==", requirement):
+            continue
+        match = _REQUIREMENT_NAME.match(requirement)
+        if match:
+            names.append(normalize_package_name(match.group(1)))
+    return names
+
+
+def dependency_levels(nodes, dependencies):
+    """
+    对节点做分层拓扑排序
+    
+    :param nodes: 节点集合
+    :param dependencies: {节点: 所依赖的节点集合}，不在 nodes 中的依赖会被忽略
+    :return: 层级列表，每层内的节点互不依赖，且只依赖前面层级的节点
+    :raises ValueError: 存在循环依赖时
+    """
+    remaining = {node: set(dependencies.get(node, ())) & nodes for node in nodes}
+    levels = []
+    while remaining:
+        level = sorted(node for node, deps in remaining.items() if not deps)
+        if not level:
+            raise ValueError(f"存在循环依赖: {', '.join(sorted(remaining))}")
+        levels.append(level)
+        done = set(level)
+        for node in level:
+            del remaining[node]
+        for deps in remaining.values():
+            deps -= done
+    return levels
+
+
+def _component_entry(name, info):
+    """将 finder 返回的组件信息整理为注册表条目"""
+    info = info or {}
+    entry_point = info.get("entry_point")
+    return {
+        "name": name,
+        "version": info.get("version", "未知"),
+        "package": info.get("package", ""),
+        "module": getattr(entry_point, "module", ""),
+        "requires": _requirement_names(getattr(entry_point, "dist", None)),
+    }
+
+
+def scan_components():
+    """扫描已安装的模块与适配器元信息（较慢，应在线程中执行）"""
+    from ErisPulse.finders import ModuleFinder, AdapterFinder
+    
+    module_finder = ModuleFinder()
+    adapter_finder = AdapterFinder()
+    modules = {
+        name: _component_entry(name, module_finder.get_module_info(name))
+        for name in module_finder.get_all_names()
+    }
+    adapters = {
+        name: _component_entry(name, adapter_finder.get_adapter_info(name))
+        for name in adapter_finder.get_all_names()
+    }
+    return modules, adapters
+
+
+class ComponentRegistry:
+    """
+    组件注册表快照
+    
+    缓存已注册模块/适配器的名称、版本、包名与运行状态，列表类命令只读快照，
+    不再重复扫描已安装的发行包。快照在超过 ttl 秒后或执行 /refresh-registry 时重建，
+    本模块执行的生命周期命令会增量更新对应条目的状态。
+    """
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.modules = {}
+        self.adapters = {}
+        self.built_at = None
+
+    def is_stale(self):
+        if self.built_at is None:
+            return True
+        return bool(self.ttl) and time.monotonic() - self.built_at > self.ttl
+
+    def replace(self, modules, adapters):
+        self.modules = modules
+        self.adapters = adapters
+        self.built_at = time.monotonic()
+
+    def module_dependencies(self):
+        """根据发行包依赖推导模块间依赖关系 {模块名: {所依赖的模块名}}"""
+        by_package = {}
+        for name, entry in self.modules.items():
+            if entry["package"]:
+                by_package.setdefault(normalize_package_name(entry["package"]), []).append(name)
+        
+        dependencies = {}
+        for name, entry in self.modules.items():
+            dependencies[name] = {
+                dep
+                for requirement in entry.get("requires", ())
+                for dep in by_package.get(requirement, ())
+                if dep != name
+            }
+        return dependencies
+
+    def owners(self):
+        """组件入口所在的顶层包名到组件描述的映射，如 {"ErisPulse_Foo": "模块 Foo"}"""
+        owners = {}
+        for kind, entries in (("模块", self.modules), ("适配器", self.adapters)):
+            for name, entry in entries.items():
+                if entry["module"]:
+                    owners[entry["module"].split(".")[0]] = f"{kind} {name}"
+        return owners
+
+    def update_module(self, name, **status):
+        entry = self.modules.get(name)
+        if entry is not None:
+            entry.update(status)
+
+    def update_adapter(self, name, **status):
+        entry = self.adapters.get(name)
+        if entry is not None:
+            entry.update(status)
+
+
+class TargetBusy(Exception):
+    """目标正在执行另一项生命周期操作"""
+
+    def __init__(self, busy):
+        self.busy = busy
+        super().__init__("\n".join(
+            f"忙碌: {kind} '{name}' 正在{operation}，请稍后再试"
+            for (kind, name), operation in busy
+        ))
+
+
+class SingleFlight:
+    """
+    按目标串行化生命周期操作
+    
+    每个目标（如 ("模块", "Foo")）同一时间只允许一项操作：相同操作的重复请求
+    会加入正在进行的操作并共享其结果，不同操作的请求会被 TargetBusy 拒绝。
+    """
+
+    def __init__(self):
+        self._inflight = {}
+
+    def operation(self, key):
+        """返回目标正在进行的操作名，空闲时返回 None"""
+        current = self._inflight.get(key)
+        return current[0] if current else None
+
+    def check(self, keys, operation):
+        """目标存在冲突的进行中操作时抛出 TargetBusy"""
+        busy = [
+            (key, self._inflight[key][0])
+            for key in keys
+            if key in self._inflight and self._inflight[key][0] != operation
+        ]
+        if busy:
+            raise TargetBusy(busy)
+
+    async def run(self, keys, operation, func):
+        """
+        在目标上执行操作
+        
+        :param keys: 操作涉及的目标键
+        :param operation: 操作名
+        :param func: 无参协程函数
+        :return: 操作结果（加入已有操作时为该操作的结果）
+        :raises TargetBusy: 目标正在执行其他操作时
+        """
+        keys = list(keys)
+        current = [self._inflight.get(key) for key in keys]
+        if keys and all(current):
+            tasks = {id(task) for _, task in current}
+            if len(tasks) == 1 and current[0][0] == operation:
+                return await asyncio.shield(current[0][1])
+        
+        busy = [(key, entry[0]) for key, entry in zip(keys, current) if entry]
+        if busy:
+            raise TargetBusy(busy)
+        
+        task = asyncio.ensure_future(func())
+        for key in keys:
+            self._inflight[key] = (operation, task)
+        
+        def release(finished):
+            for key in keys:
+                if self._inflight.get(key, (None, None))[1] is finished:
+                    del self._inflight[key]
+        
+        task.add_done_callback(release)
+        # shield: 调用方被取消时操作本身仍会完成，避免组件停留在半初始化状态
+        return await asyncio.shield(task)
+
+
+# 延迟直方图桶上界（秒）
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+# 生命周期操作统计中的类型与操作名在报告中的显示名称
+TARGET_KIND_LABELS = {"module": "模块", "adapter": "适配器"}
+TARGET_OPERATION_LABELS = {"load": "加载", "unload": "卸载", "startup": "启动", "shutdown": "停止", "downtime": "中断"}
+
+# 当前正在执行的命令调用状态，供错误日志归属到命令
+_current_call = contextvars.ContextVar("admincontrol_current_call", default=None)
+
+
+def _call_source():
+    """当前操作的触发来源：管理命令，或框架/其他模块"""
+    return "管理命令" if _current_call.get() is not None else "框架/其他模块"
+
+
+class LatencyHistogram:
+    """固定桶延迟直方图，分位数按桶内线性插值估算"""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.max:
+            self.max = seconds
+
+    def quantile(self, q):
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for i, bucket_count in enumerate(self.counts):
+            if bucket_count and cumulative + bucket_count >= rank:
+                lower = LATENCY_BUCKETS[i - 1] if i else 0.0
+                upper = LATENCY_BUCKETS[i] if i < len(LATENCY_BUCKETS) else self.max
+                estimate = lower + (upper - lower) * (rank - cumulative) / bucket_count
+                return min(estimate, self.max)
+            cumulative += bucket_count
+        return self.max
+
+
+class CommandStats:
+    """单个命令的调用统计"""
+
+    __slots__ = ("calls", "errors", "latency")
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = LatencyHistogram()
+
+
+def _prom_labels(**labels):
+    def escape(value):
+        return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return ",".join(f'{key}="{escape(value)}"' for key, value in labels.items())
+
+
+class Metrics:
+    """
+    AdminControl 命令与生命周期操作的耗时/结果统计
+    
+    生命周期操作除耗时分布外还保留每个 (类型, 名称, 操作) 最近一次的结果，
+    source 区分由管理命令触发还是由框架或其他模块触发。
+    """
+
+    def __init__(self):
+        self.commands = {}
+        self.targets = {}
+        self.target_last = {}
+        self.targets_since = None
+        # 事件循环延迟探测结果
+        self.loop_lag = LatencyHistogram()
+
+    def command(self, name):
+        stats = self.commands.get(name)
+        if stats is None:
+            stats = self.commands[name] = CommandStats()
+        return stats
+
+    def observe_target(self, kind, name, operation, seconds, ok=True, priority=None):
+        key = (kind, name, operation)
+        histogram = self.targets.get(key)
+        if histogram is None:
+            histogram = self.targets[key] = LatencyHistogram()
+        histogram.observe(seconds)
+        
+        now = time.time()
+        if self.targets_since is None:
+            self.targets_since = now
+        self.target_last[key] = {
+            "seconds": seconds,
+            "ok": ok,
+            "source": _call_source(),
+            "priority": priority,
+            "at": now,
+        }
+
+    def last_of(self, kind, operation):
+        """{名称: 最近一次记录}"""
+        return {
+            name: record
+            for (record_kind, name, record_operation), record in self.target_last.items()
+            if record_kind == kind and record_operation == operation
+        }
+
+    @contextmanager
+    def time_target(self, kind, name, operation):
+        """记录一次模块/适配器生命周期操作的耗时"""
+        started = time.perf_counter()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.observe_target(kind, name, operation, time.perf_counter() - started, ok)
+
+    @staticmethod
+    def _prom_histogram(lines, metric, histogram, labels):
+        cumulative = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS, histogram.counts):
+            cumulative += bucket_count
+            lines.append(f"{metric}_bucket{{{_prom_labels(**labels, le=bound)}}} {cumulative}")
+        lines.append(f"{metric}_bucket{{{_prom_labels(**labels, le='+Inf')}}} {histogram.count}")
+        suffix = f"{{{_prom_labels(**labels)}}}" if labels else ""
+        lines.append(f"{metric}_sum{suffix} {histogram.total}")
+        lines.append(f"{metric}_count{suffix} {histogram.count}")
+
+    def to_prometheus(self):
+        """导出为 Prometheus 文本格式"""
+        lines = [
+            "# HELP admincontrol_command_calls_total AdminControl 命令调用次数",
+            "# TYPE admincontrol_command_calls_total counter",
+        ]
+        for name, stats in sorted(self.commands.items()):
+            lines.append(f"admincontrol_command_calls_total{{{_prom_labels(command=name)}}} {stats.calls}")
+        lines.append("# HELP admincontrol_command_errors_total AdminControl 命令出错次数")
+        lines.append("# TYPE admincontrol_command_errors_total counter")
+        for name, stats in sorted(self.commands.items()):
+            lines.append(f"admincontrol_command_errors_total{{{_prom_labels(command=name)}}} {stats.errors}")
+        lines.append("# HELP admincontrol_command_duration_seconds AdminControl 命令耗时")
+        lines.append("# TYPE admincontrol_command_duration_seconds histogram")
+        for name, stats in sorted(self.commands.items()):
+            self._prom_histogram(lines, "admincontrol_command_duration_seconds", stats.latency, {"command": name})
+        lines.append("# HELP admincontrol_target_duration_seconds 模块/适配器生命周期操作耗时")
+        lines.append("# TYPE admincontrol_target_duration_seconds histogram")
+        for (kind, name, operation), histogram in sorted(self.targets.items()):
+            self._prom_histogram(
+                lines, "admincontrol_target_duration_seconds", histogram,
+                {"kind": kind, "name": name, "operation": operation},
+            )
+        lines.append("# HELP admincontrol_loop_lag_seconds 事件循环调度延迟")
+        lines.append("# TYPE admincontrol_loop_lag_seconds histogram")
+        self._prom_histogram(lines, "admincontrol_loop_lag_seconds", self.loop_lag, {})
+        return "\n".join(lines) + "\n"
+
+
+def coroutine_frames(coro):
+    """沿 await 链由外到内返回协程的栈帧"""
+    frames = []
+    while coro is not None:
+        frame = getattr(coro, "cr_frame", None) or getattr(coro, "gi_frame", None)
+        if frame is None:
+            break
+        frames.append(frame)
+        coro = getattr(coro, "cr_await", None) or getattr(coro, "gi_yieldfrom", None)
+    return frames
+
+
+def describe_task(task, owners):
+    """
+    返回任务的所属组件与当前执行位置
+    
+    所属组件取 await 链上第一个属于已注册组件的栈帧，都不属于时取最外层栈帧的顶层包名。
+    
+    :param owners: 顶层包名到组件描述的映射
+    :return: (所属组件, 当前位置)
+    """
+    frames = coroutine_frames(task.get_coro())
+    if not frames:
+        return "(未知)", "(已结束或非协程)"
+    
+    owner = None
+    for frame in frames:
+        package = frame.f_globals.get("__name__", "").split(".")[0]
+        if package in owners:
+            owner = owners[package]
+            break
+    if owner is None:
+        owner = frames[0].f_globals.get("__name__", "(未知)").split(".")[0]
+    
+    inner = frames[-1]
+    code = inner.f_code
+    filename = code.co_filename.replace("\\", "/").rsplit("/", 2)
+    location = f"{code.co_name} ({'/'.join(filename[-2:])}:{inner.f_lineno})"
+    return owner, location
+
+
+def profile_top(profiler, path, limit, package=None):
+    """
+    保存性能数据并返回按累计耗时排序的前 limit 个函数
+    
+    :param profiler: 已停止的 cProfile.Profile
+    :param path: 性能数据保存路径（可用 pstats / snakeviz 等工具打开）
+    :param package: 仅保留源文件位于该顶层包中的函数
+    :return: (总耗时, [(累计耗时, 自身耗时, 调用次数, 函数描述), ...])
+    """
+    import os
+    import pstats
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    profiler.dump_stats(path)
+    
+    stats = pstats.Stats(profiler)
+    rows = []
+    for (filename, lineno, funcname), (_, calls, own, cumulative, _) in stats.stats.items():
+        normalized = filename.replace("\\", "/")
+        if package and f"/{package}/" not in normalized and not normalized.endswith(f"/{package}.py"):
+            continue
+        if lineno:
+            location = "/".join(normalized.rsplit("/", 2)[-2:])
+            description = f"{funcname} ({location}:{lineno})"
+        else:
+            # 内置函数没有源文件位置
+            description = funcname
+        rows.append((cumulative, own, calls, description))
+    rows.sort(key=lambda row: -row[0])
+    return stats.total_tt, rows[:limit]
+
+
+def _file_package(filename):
+    """site-packages 中源文件所在的顶层包名，其他位置返回 None"""
+    _, sep, rest = filename.replace("\\", "/").rpartition("site-packages/")
+    if not sep:
+        return None
+    top = rest.split("/")[0]
+    return top[:-3] if top.endswith(".py") else top
+
+
+def attribute_allocations(stats, owners, diff=False):
+    """
+    按组件汇总 tracemalloc 统计
+    
+    每条分配沿调用栈由内到外找到第一个属于已注册组件的栈帧，都不属于时归到分配位置所在的包。
+    
+    :param stats: 按 traceback 分组的 Statistic（diff 为 True 时为 StatisticDiff）列表
+    :param owners: 顶层包名到组件描述的映射
+    :return: {归属: [字节数, 内存块数]}
+    """
+    cache = {}
+    
+    def owner_of(filename):
+        if filename not in cache:
+            path = filename.replace("\\", "/")
+            cache[filename] = next(
+                (label for package, label in owners.items()
+                 if f"/{package}/" in path or path.endswith(f"/{package}.py")),
+                None,
+            )
+        return cache[filename]
+    
+    totals = {}
+    for stat in stats:
+        owner = None
+        for frame in reversed(stat.traceback):
+            owner = owner_of(frame.filename)
+            if owner is not None:
+                break
+        if owner is None:
+            owner = _file_package(stat.traceback[-1].filename) or "(标准库/其他)"
+        entry = totals.setdefault(owner, [0, 0])
+        entry[0] += stat.size_diff if diff else stat.size
+        entry[1] += stat.count_diff if diff else stat.count
+    return totals
+
+
+def format_size_delta(size):
+    return f"{'+' if size >= 0 else '-'}{format_size(abs(size))}"
+
+
+def critical_path(durations, dependencies):
+    """
+    按依赖层级并行执行时的总耗时（各层最大耗时之和），存在循环依赖时按串行计算
+    
+    :param durations: {名称: 耗时}
+    :param dependencies: {名称: {所依赖的名称}}
+    """
+    try:
+        levels = dependency_levels(set(durations), dependencies)
+    except ValueError:
+        return sum(durations.values())
+    return sum(max(durations[name] for name in level) for level in levels)
+
+
+def split_text(text, budget):
+    """
+    按行边界将文本切分为不超过 budget 个字符的片段
+    
+    单行超过 budget 时在行内硬切分。
+    """
+    chunks = []
+    current = []
+    size = 0
+    for line in text.split("\n"):
+        while len(line) > budget:
+            if current:
+                chunks.append("\n".join(current))
+                current, size = [], 0
+            chunks.append(line[:budget])
+            line = line[budget:]
+        added = len(line) + (1 if current else 0)
+        if current and size + added > budget:
+            chunks.append("\n".join(current))
+            current, size = [], 0
+            added = len(line)
+        current.append(line)
+        size += added
+    if current:
+        chunks.append("\n".join(current))
+    return chunks
+
+
+def format_size(size):
+    """格式化字节数"""
+    for unit in ("B", "KiB", "MiB"):
+        if size < 1024:
+            return f"{size:.0f}{unit}" if unit == "B" else f"{size:.1f}{unit}"
+        size /= 1024
+    return f"{size:.1f}GiB"
+
+
+def serialized_size(value):
+    """值按 JSON 序列化后的字节数，无法序列化时按 repr 估算"""
+    import json
+    try:
+        text = json.dumps(value, ensure_ascii=False)
+    except (TypeError, ValueError):
+        text = repr(value)
+    return len(text.encode("utf-8"))
+
+
+class NamespaceUsage:
+    """
+    单个命名空间的存储占用统计
+    
+    键数精确统计；值只对蓄水池抽样得到的至多 sample_size 个键读取，
+    总大小按样本平均值估算，键数不超过样本容量时为精确值。
+    """
+
+    def __init__(self, sample_size):
+        self.count = 0
+        self.sample_size = sample_size
+        self.sample = []
+        self.sampled_bytes = 0
+        self.largest = (0, None)
+        self.types = {}
+
+    def offer(self, key):
+        """登记一个键，按蓄水池抽样决定是否纳入样本"""
+        self.count += 1
+        if len(self.sample) < self.sample_size:
+            self.sample.append(key)
+            return
+        index = random.randrange(self.count)
+        if index < self.sample_size:
+            self.sample[index] = key
+
+    def measure(self, key, value):
+        """记录样本键的值"""
+        size = serialized_size(value)
+        self.sampled_bytes += size
+        if size > self.largest[0]:
+            self.largest = (size, key)
+        type_name = type(value).__name__
+        self.types[type_name] = self.types.get(type_name, 0) + 1
+
+    @property
+    def exact(self):
+        return self.count <= self.sample_size
+
+    @property
+    def estimated_bytes(self):
+        if not self.sample:
+            return 0
+        return self.sampled_bytes / len(self.sample) * self.count
+
+
+class ExpiryIndex:
+    """
+    存储键过期索引
+    
+    deadlines 记录每个键当前的过期时间（Unix 时间戳），堆按过期时间排序；
+    键被重新设置或移除后旧的堆条目不会立即删除，弹出时与 deadlines 比对跳过。
+    索引只存在于内存中，持久化由调用方负责。
+    """
+
+    def __init__(self, deadlines=None):
+        self.deadlines = dict(deadlines or {})
+        self._heap = [(deadline, key) for key, deadline in self.deadlines.items()]
+        heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self.deadlines)
+
+    def set(self, key, deadline):
+        self.deadlines[key] = deadline
+        heapq.heappush(self._heap, (deadline, key))
+        # 失效条目过多时重建堆，避免频繁续期的键使堆无限增长
+        if len(self._heap) > 2 * len(self.deadlines) + 1024:
+            self._heap = [(d, k) for k, d in self.deadlines.items()]
+            heapq.heapify(self._heap)
+
+    def discard(self, key):
+        return self.deadlines.pop(key, None) is not None
+
+    def remaining(self, key, now):
+        """剩余有效期（秒），未设置过期时间时返回 None"""
+        deadline = self.deadlines.get(key)
+        return None if deadline is None else deadline - now
+
+    def pop_expired(self, now, limit):
+        """移除并返回至多 limit 个已过期的键"""
+        expired = []
+        while self._heap and self._heap[0][0] <= now and len(expired) < limit:
+            deadline, key = heapq.heappop(self._heap)
+            if self.deadlines.get(key) == deadline:
+                del self.deadlines[key]
+                expired.append(key)
+        return expired
+
+
+class ReplyPager:
+    """超长输出的服务端分页缓存，按会话保存，过期自动失效"""
+
+    def __init__(self):
+        self._sessions = {}
+
+    def _purge(self, now):
+        expired = [key for key, entry in self._sessions.items() if entry["expires"] <= now]
+        for key in expired:
+            del self._sessions[key]
+
+    def store(self, key, pages, ttl):
+        now = time.monotonic()
+        self._purge(now)
+        self._sessions[key] = {"pages": pages, "current": 0, "expires": now + ttl}
+
+    def page(self, key, index):
+        """
+        取出指定页并将其设为当前页
+        
+        :return: (页内容, 页序号, 总页数)；无缓存或已过期返回 None，页码越界时页内容为 None
+        """
+        entry = self._sessions.get(key)
+        if entry is None or entry["expires"] <= time.monotonic():
+            self._sessions.pop(key, None)
+            return None
+        pages = entry["pages"]
+        if not 0 <= index < len(pages):
+            return None, index, len(pages)
+        entry["current"] = index
+        return pages[index], index, len(pages)
+
+    def current(self, key):
+        entry = self._sessions.get(key)
+        return entry["current"] if entry else None
+
+
+class EventHold:
+    """
+    暂存指定平台的入站事件
+    
+    暂存期间替换 adapter 管理器的 emit，目标平台的事件进入有界队列（满时丢弃最早的事件），
+    其余平台照常分发；释放时按到达顺序重放，全部平台释放后恢复原 emit。
+    平台为 None 时暂存所有平台的事件。
+    """
+
+    def __init__(self, adapter_manager):
+        self._manager = adapter_manager
+        self._queues = {}
+        self._dropped = {}
+        self._original = None
+        self._patched = False
+
+    def hold(self, platform, maxlen):
+        """开始暂存平台事件"""
+        if not self._queues:
+            self._install()
+        self._queues[platform] = deque(maxlen=maxlen)
+        self._dropped[platform] = 0
+
+    async def release(self, platform):
+        """
+        停止暂存并按顺序重放平台事件
+        
+        :return: (重放条数, 因队列已满丢弃的条数)
+        """
+        queue = self._queues.get(platform)
+        replayed = 0
+        try:
+            # 重放期间仍处于暂存状态，新到达的事件排在队尾，保证顺序
+            while queue:
+                await self._original(queue.popleft())
+                replayed += 1
+        finally:
+            self._queues.pop(platform, None)
+            dropped = self._dropped.pop(platform, 0)
+            if not self._queues:
+                self._uninstall()
+        return replayed, dropped
+
+    def pending(self, platform):
+        """平台当前暂存的事件数"""
+        queue = self._queues.get(platform)
+        return len(queue) if queue is not None else 0
+
+    def clear(self):
+        """丢弃所有暂存的事件并恢复原 emit，返回丢弃的事件数"""
+        dropped = sum(len(queue) for queue in self._queues.values())
+        self._queues.clear()
+        self._dropped.clear()
+        self._uninstall()
+        return dropped
+
+    async def _emit(self, data):
+        platform = data.get("platform")
+        if platform not in self._queues:
+            platform = None
+        queue = self._queues.get(platform)
+        if queue is None:
+            return await self._original(data)
+        if len(queue) == queue.maxlen:
+            self._dropped[platform] += 1
+        queue.append(data)
+
+    def _install(self):
+        self._original = getattr(self._manager, "emit", None)
+        if self._original is None:
+            return
+        self._patched = "emit" in vars(self._manager)
+        self._manager.emit = self._emit
+
+    def _uninstall(self):
+        if self._original is None:
+            return
+        if self._patched:
+            self._manager.emit = self._original
+        else:
+            del self._manager.emit
+        self._original = None
+
+
+class AdapterHealth:
+    """单个适配器的自动恢复状态"""
+
+    def __init__(self):
+        # 连续重启失败次数
+        self.failures = 0
+        # 本次故障开始时间（monotonic），运行正常时为 None
+        self.down_since = None
+        # 下次允许尝试重启的时间（指数退避）
+        self.next_attempt = 0.0
+        # 熔断结束时间，熔断期间不再尝试重启
+        self.breaker_until = 0.0
+        self.restarts = 0
+        self.recoveries = deque(maxlen=50)
+        self.history = deque(maxlen=10)
+
+    @property
+    def mttr(self):
+        """平均恢复时间（秒），无恢复记录时为 None"""
+        if not self.recoveries:
+            return None
+        return sum(self.recoveries) / len(self.recoveries)
+
+    def breaker_open(self, now):
+        return now < self.breaker_until
+
+    def mark_down(self, now):
+        if self.down_since is None:
+            self.down_since = now
+
+    def mark_recovered(self, now):
+        if self.down_since is not None:
+            self.recoveries.append(now - self.down_since)
+        self.down_since = None
+        self.failures = 0
+        self.next_attempt = 0.0
+        self.breaker_until = 0.0
+
+    def mark_failed(self, now, backoff_base, backoff_max, threshold, cooldown):
+        """记录一次重启失败，计算下次重启时间；连续失败达到阈值时熔断"""
+        self.failures += 1
+        delay = min(backoff_base * 2 ** (self.failures - 1), backoff_max)
+        self.next_attempt = now + delay * random.uniform(0.8, 1.2)
+        if self.failures >= threshold:
+            self.breaker_until = now + cooldown
+            return True
+        return False
+
+
+class ConfigWriter:
+    """
+    合并的配置写入
+    
+    对同一配置键的修改在 window 秒内合并为一批：读取最新值后按提交顺序依次应用各修改函数，
+    再在线程中一次性写入。每个修改都基于此前所有修改的结果计算，不会出现并发命令互相覆盖；
+    同一顶层配置键（含其子路径）的各批写入严格串行。
+    """
+
+    def __init__(self, config, window=0.05, on_commit=None):
+        self._config = config
+        self.window = window
+        self._on_commit = on_commit
+        self._pending = {}
+        self._flushing = {}
+        self._locks = {}
+
+    async def update(self, key, func):
+        """
+        修改配置
+        
+        :param key: 配置键，支持点分路径，此时仅读写该子树
+        :param func: 接收当前值的副本（可能为 None），返回 (新值, 结果) 的函数；抛出异常时该修改不生效
+        :return: func 返回的结果
+        :raises Exception: func 抛出的异常，或写入失败时的 RuntimeError
+        
+        调用方在修改被应用前取消时该修改被丢弃；已开始写入的修改无法撤回。
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._pending.setdefault(key, []).append((func, future))
+        if key not in self._flushing:
+            self._flushing[key] = asyncio.ensure_future(self._flush_later(key))
+        return await future
+
+    async def flush(self):
+        """等待所有已登记的修改写入完成"""
+        while self._flushing:
+            await asyncio.gather(*self._flushing.values(), return_exceptions=True)
+
+    async def _flush_later(self, key):
+        try:
+            await asyncio.sleep(self.window)
+        finally:
+            # 此后登记的修改进入下一批
+            del self._flushing[key]
+        batch = self._pending.pop(key, [])
+        # 同一顶层键下的父子路径共用一把锁，避免整体写入覆盖子路径的写入
+        lock = self._locks.setdefault(key.split(".", 1)[0], asyncio.Lock())
+        async with lock:
+            await self._commit(key, batch)
+
+    async def _commit(self, key, batch):
+        # 调用方已取消（命令超时、卸载等）的修改直接丢弃
+        batch = [(func, future) for func, future in batch if not future.done()]
+        if not batch:
+            return
+        
+        applied = []
+        try:
+            value = copy.deepcopy(self._config.getConfig(key))
+            original = copy.deepcopy(value)
+            for func, future in batch:
+                if future.done():
+                    continue
+                try:
+                    value, result = func(copy.deepcopy(value))
+                except Exception as e:
+                    future.set_exception(e)
+                    continue
+                applied.append((future, result))
+            
+            if value != original:
+                success = await asyncio.to_thread(self._config.setConfig, key, value)
+                if not success:
+                    raise RuntimeError(f"写入配置 '{key}' 失败")
+                if self._on_commit is not None:
+                    self._on_commit(key.split(".", 1)[0])
+        except BaseException as e:
+            error = e if isinstance(e, RuntimeError) else RuntimeError(f"写入配置 '{key}' 失败: {e}")
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+            if not isinstance(e, Exception):
+                raise
+            return
+        
+        for future, result in applied:
+            if not future.done():
+                future.set_result(result)
+
+
+# 命令表条目
+CommandSpec = namedtuple("CommandSpec", "names group help usage permission method")
+
+
 class Main(BaseModule):
 
+    # /list-storage 默认/最大每页数量
+    STORAGE_PAGE_SIZE = 50
+    STORAGE_PAGE_SIZE_MAX = 500
+    # 遍历存储键时每扫描多少个键让出一次事件循环
+    STORAGE_SCAN_YIELD_EVERY = 5000
+    # 存储批量导入/导出每批的键数
+    STORAGE_BATCH_SIZE = 1000
+    # 按模式批量删除的确认有效期（秒）
+    STORAGE_DELETE_CONFIRM_TTL = 60
+    # 存储键过期时间的持久化位置：每个键一条 {前缀}{键名} -> 过期时间，不出现在存储管理命令中
+    TTL_KEY_PREFIX = "AdminControl:ttl:"
+    # 事件循环延迟探测每多少次登记一次任务
+    LOOP_TASK_SAMPLE_EVERY = 20
+
+    # 命令表：新增命令只需在此登记并实现对应方法
+    # (命令名与别名, 命令组, 帮助, 用法, 所需角色, 实现方法名)；所需角色为 None 表示无需权限
+    COMMANDS = (
+        # ========== 列表命令 ==========
+        CommandSpec(["list-modules", "lm"], "list", "列出所有已注册的模块", None, "viewer", "_list_modules"),
+        CommandSpec(["list-adapters", "la"], "list", "列出所有已注册的适配器", None, "viewer", "_list_adapters"),
+        CommandSpec(["list-all", "ls"], "list", "列出所有组件（模块和适配器）", None, "viewer", "_list_all"),
+        CommandSpec(["next"], "list", "查看上一条长输出的下一页", None, None, "_next_page"),
+        CommandSpec(["page"], "list", "查看上一条长输出的指定页", "page <页码>", None, "_show_page"),
+        CommandSpec(["refresh-registry"], "list", "刷新组件注册表快照", None, "operator", "_refresh_registry_command"),
+
+        # ========== 框架管理命令 ==========
+        CommandSpec(["restart-framework", "restart"], "framework", "重启 ErisPulse 框架（--drain 先排空进行中的任务）", "restart-framework [--drain] [--timeout 秒数]", "owner", "_restart_framework"),
+        CommandSpec(["loop-stats"], "framework", "查看事件循环延迟与任务数", None, "operator", "_loop_stats"),
+        CommandSpec(["tasks"], "framework", "按所属组件列出 asyncio 任务", "tasks [组件名]", "operator", "_tasks"),
+        CommandSpec(["profile"], "framework", "在指定时间窗口内采集 CPU 性能数据", "profile <秒数> [--module 组件名] [--top N]", "operator", "_profile"),
+        CommandSpec(["mem-snapshot"], "framework", "开启内存分配追踪并记录基准快照", "mem-snapshot [--stop]", "operator", "_mem_snapshot"),
+        CommandSpec(["mem-diff"], "framework", "对比基准快照，按模块/适配器统计内存增长", "mem-diff [--top N] [--reset]", "operator", "_mem_diff"),
+        CommandSpec(["startup-report"], "framework", "查看模块/适配器加载耗时与可节省的时间", "startup-report [--top N]", "operator", "_startup_report"),
+        CommandSpec(["admin-stats"], "framework", "查看管理命令耗时与出错统计", "admin-stats [命令名] [--export]", "operator", "_admin_stats"),
+
+        # ========== 模块管理命令 ==========
+        CommandSpec(["reload-module", "rm"], "module", "按依赖顺序重新加载模块", "reload-module <模块名...> | --dependents <模块名> [--check-leak]", "operator", "_reload_module"),
+        CommandSpec(["load-module"], "module", "加载指定模块", "load-module <模块名>", "operator", "_load_module"),
+        CommandSpec(["unload-module", "um"], "module", "卸载指定模块", "unload-module <模块名>", "operator", "_unload_module"),
+        CommandSpec(["enable-module"], "module", "启用指定模块", "enable-module <模块名>", "operator", "_enable_module"),
+        CommandSpec(["disable-module"], "module", "禁用指定模块", "disable-module <模块名>", "operator", "_disable_module"),
+
+        # ========== 适配器管理命令 ==========
+        CommandSpec(["start-adapter"], "adapter", "启动指定适配器（支持多个或 --all）", "start-adapter <适配器名...> | --all", "operator", "_start_adapter"),
+        CommandSpec(["stop-adapter"], "adapter", "停止指定适配器（支持多个或 --all）", "stop-adapter <适配器名...> | --all", "operator", "_stop_adapter"),
+        CommandSpec(["restart-adapter"], "adapter", "重启指定适配器（支持多个或 --all，--measure 报告中断时间）", "restart-adapter <适配器名...> | --all [--measure]", "operator", "_restart_adapter"),
+        CommandSpec(["enable-adapter"], "adapter", "启用指定适配器", "enable-adapter <适配器名>", "operator", "_enable_adapter"),
+        CommandSpec(["disable-adapter"], "adapter", "禁用指定适配器", "disable-adapter <适配器名>", "operator", "_disable_adapter"),
+        CommandSpec(["adapter-status"], "adapter", "查看适配器运行状态", "adapter-status [适配器名]", "viewer", "_adapter_status"),
+
+        # ========== 配置管理命令 ==========
+        CommandSpec(["get-config"], "config", "获取模块/适配器配置（支持路径）", "get-config <配置路径>", "operator", "_get_config"),
+        CommandSpec(["set-config"], "config", "设置模块/适配器配置（支持路径）", "set-config <配置路径> <值>", "owner", "_set_config"),
+        CommandSpec(["patch-config"], "config", "以 JSON Merge Patch 局部更新配置", "patch-config <配置路径> <JSON>", "owner", "_patch_config"),
+
+        # ========== 权限管理命令 ==========
+        CommandSpec(["add-admin"], "admin", "添加管理员（支持多个）", "add-admin <用户ID/群组ID...>", "owner", "_add_admin"),
+        CommandSpec(["remove-admin"], "admin", "移除管理员（支持多个）", "remove-admin <用户ID/群组ID...>", "owner", "_remove_admin"),
+        CommandSpec(["list-admins"], "admin", "列出所有管理员", None, "viewer", "_list_admins"),
+
+        # ========== 存储管理命令 ==========
+        CommandSpec(["get-storage"], "storage", "获取存储值", "get-storage <键名>", "operator", "_get_storage"),
+        CommandSpec(["set-storage"], "storage", "设置存储值（可指定有效期）", "set-storage <键名> <值> [--ttl 秒数]", "operator", "_set_storage"),
+        CommandSpec(["mset-storage"], "storage", "批量设置存储值", "mset-storage <JSON 对象>", "operator", "_mset_storage"),
+        CommandSpec(["delete-storage"], "storage", "删除存储值（支持按模式批量删除）", "delete-storage <键名> | --match <前缀|通配符> [--confirm <确认码>]", "operator", "_delete_storage"),
+        CommandSpec(["list-storage"], "storage", "分页列出存储键名", "list-storage [前缀|通配符] [--cursor 令牌 | --page N] [--limit K]", "viewer", "_list_storage"),
+        CommandSpec(["storage-usage"], "storage", "按命名空间统计存储占用", "storage-usage [前缀|通配符]", "operator", "_storage_usage"),
+        CommandSpec(["export-storage"], "storage", "将存储导出为 JSONL 文件", "export-storage [前缀|通配符] <文件路径> [--gzip]", "owner", "_export_storage"),
+        CommandSpec(["import-storage"], "storage", "从 JSONL 文件导入存储", "import-storage <文件路径> [--dry-run]", "owner", "_import_storage"),
+    )
+
     def __init__(self, sdk):
         self.sdk = sdk
+        # 角色权限矩阵、编译时所用配置值的副本与下次与配置比对的时间
+        self._permissions = None
+        self._permissions_source = None
+        self._permissions_recheck_at = 0.0
+        # 最近一次权限检查结果 (事件, (角色, 命令组), 结果)，使 permission 守卫与处理器共享同一次检查
+        self._permission_check = (None, None, False)
+        self._registry = ComponentRegistry()
+        self._registry_refresh = None
+        self._command_handlers = {}
+        self._flights = SingleFlight()
+        self._metrics = Metrics()
+        self._pager = ReplyPager()
+        # 待确认的批量删除：会话键 -> (模式, 确认码, 过期时间)
+        self._pending_deletes = {}
+        # 后台运行的存储占用统计：会话键 -> 任务
+        self._usage_tasks = {}
+        # 存储键过期索引在首次使用时从存储加载，由后台清理任务定期删除过期键
+        self._expiry = None
+        self._sweeper_task = None
+        # 加载计时钩子、过期键清理与事件循环探测是否已启动（lazy 模式下在首个命令时启动）
+        self._background_started = False
+        # 事件循环延迟探测：后台任务、最近的探测结果与各任务首次被观察到的时间
+        self._loop_probe_task = None
+        self._loop_lag_recent = deque(maxlen=120)
+        self._task_seen = weakref.WeakKeyDictionary()
+        # 同一时间只能有一个性能采集窗口
+        self._profiling = False
+        # /mem-snapshot 记录的基准快照 (快照, 时间)
+        self._mem_baseline = None
+        # 安装在模块/适配器管理器上的计时包装，耗时记入 self._metrics
+        self._load_hooks = []
+        # 配置写入合并层，AdminControl 配置写入后丢弃权限矩阵
+        self._config_writer = ConfigWriter(sdk.config, on_commit=self._on_config_commit)
+        # 适配器看门狗：健康状态、后台任务与被手动停止（不自动恢复）的适配器
+        self._adapter_health = {}
+        self._watchdog_task = None
+        self._watchdog_paused = set()
+        self._event_hold = EventHold(sdk.adapter)
+        # 适配器批量操作的并发名额 (并发数, 信号量)，在首次使用时创建
+        self._adapter_slots = None
 
     def _get_admins(self):
         """获取管理员列表"""
@@ -14,30 +1368,102 @@ class Main(BaseModule):
             return config.get("admins", [])
         return []
 
+    def _invalidate_permissions(self):
+        """AdminControl 配置写入后丢弃权限矩阵，下次检查时重新编译"""
+        self._permissions = None
+        self._permission_check = (None, None, False)
+
+    def _get_permissions(self):
+        """
+        获取角色权限矩阵
+        
+        通过本模块写入的配置在提交时即丢弃矩阵；其他途径（其他模块、手动编辑配置文件）的修改
+        每隔 permission_recheck_interval 秒与编译时的 admins / roles / public_read 比较一次，
+        两次比较之间的检查直接使用已编译的矩阵，开销与管理员和规则数量无关。
+        """
+        now = time.monotonic()
+        if self._permissions is not None and now < self._permissions_recheck_at:
+            return self._permissions
+        
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        self._permissions_recheck_at = now + config.get("permission_recheck_interval", 5)
+        source = (config.get("admins", []), config.get("roles", []), config.get("public_read", False))
+        if self._permissions is None or self._permissions_source != source:
+            command_groups = dict.fromkeys(spec.group for spec in self.COMMANDS)
+            self._permissions = PermissionMatrix(*source[:2], command_groups, public_read=source[2])
+            # 保存副本，配置被原地修改时也能发现
+            self._permissions_source = copy.deepcopy(source)
+            self._permission_check = (None, None, False)
+            for error in self._permissions.errors:
+                self.logger.error(error)
+        return self._permissions
+
+    def has_role(self, event, role, command_group):
+        """检查事件发送者在当前会话中对该命令组是否具有不低于 role 的角色"""
+        checked_event, checked_key, checked_result = self._permission_check
+        if checked_event is event and checked_key == (role, command_group):
+            return checked_result
+        
+        permissions = self._get_permissions()
+        if not permissions and not (role == "viewer" and permissions.public_read):
+            self.logger.warning("未配置管理员列表或角色规则，所有用户都无法执行管理命令")
+        result = permissions.allows(event.get("user_id"), event.get("group_id"), command_group, role)
+        
+        self._permission_check = (event, (role, command_group), result)
+        return result
+
+    def _on_config_commit(self, key):
+        if key == "AdminControl":
+            self._invalidate_permissions()
+
     def is_admin(self, event):
-        """检查用户是否是管理员"""
-        admins = self._get_admins()
-        if not admins:
-            self.logger.warning("未配置管理员列表，所有用户都无法执行管理命令")
-            return False
-        
-        user_id = event.get("user_id")
-        group_id = event.get("group_id")
-        
-        # 检查用户ID
-        if user_id and str(user_id) in admins:
-            return True
-        
-        # 检查群组ID（允许群组管理）
-        if group_id and str(group_id) in admins:
-            return True
-        
-        return False
+        """检查用户是否是管理员（在 admin 命令组拥有 owner 角色，包括管理员列表中的用户ID/群组ID）"""
+        return self.has_role(event, "owner", "admin")
+
+    def _instrument(self, name):
+        """统计命令处理器的调用次数、出错次数与耗时"""
+        def decorator(handler):
+            @functools.wraps(handler)
+            async def wrapper(event):
+                stats = self._metrics.command(name)
+                call = {"failed": False}
+                token = _current_call.set(call)
+                started = time.perf_counter()
+                try:
+                    return await handler(event)
+                except Exception:
+                    call["failed"] = True
+                    raise
+                finally:
+                    stats.calls += 1
+                    stats.errors += call["failed"]
+                    stats.latency.observe(time.perf_counter() - started)
+                    _current_call.reset(token)
+            return wrapper
+        return decorator
+
+    def _log_error(self, message):
+        """记录错误日志，并将当前命令调用计为出错"""
+        self.logger.error(message)
+        call = _current_call.get()
+        if call is not None:
+            call["failed"] = True
+
+    @staticmethod
+    def _get_startup_mode(config):
+        """读取启动模式：eager（默认）在加载时预热，lazy 推迟到首个命令"""
+        mode = (config or {}).get("startup_mode", "eager")
+        return mode if mode in ("eager", "lazy") else "eager"
 
     @staticmethod
     def get_load_strategy():
         from ErisPulse.loaders import ModuleLoadStrategy
-        return ModuleLoadStrategy(lazy_load=False, priority=100)
+        from ErisPulse.Core import config
+        
+        # 管理命令必须在启动时注册，因此两种模式都不使用框架懒加载；
+        # lazy 模式以低于默认值 0 的优先级加载，排在未声明优先级的模块之后
+        lazy = Main._get_startup_mode(config.getConfig("AdminControl")) == "lazy"
+        return ModuleLoadStrategy(lazy_load=False, priority=-100 if lazy else 100)
 
     async def on_load(self, event):
         # SDK 对象会在模块实例化时设置
@@ -45,317 +1471,270 @@ class Main(BaseModule):
         self.logger = self.sdk.logger.get_child("AdminControl")
         self.logger.info("AdminControl 模块正在加载...")
         
-        # 注册所有管理命令
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        self._registry.ttl = config.get("registry_ttl", 300)
+        self._config_writer.window = config.get("config_write_window", 0.05)
+        startup_mode = self._get_startup_mode(config)
+        if startup_mode == "eager":
+            # 注册表在后台构建，不阻塞模块加载；首个列表命令会等待其完成
+            self._registry_refresh = asyncio.ensure_future(self._rebuild_registry())
+            self._get_permissions()
+        
+        # 注册所有管理命令（lazy 模式下仅注册命令，其余组件在首次使用时构建）
         self._register_commands()
+        if startup_mode == "eager":
+            # 本模块优先加载，此后框架加载其他模块的耗时也会被记录
+            self._start_background(config)
+        
+        if config.get("watchdog_enabled", False):
+            self._watchdog_task = asyncio.ensure_future(self._watchdog_loop())
         
-        self.logger.info("AdminControl 模块已加载")
+        self.logger.info(f"AdminControl 模块已加载（启动模式: {startup_mode}）")
         return True
 
+    def _start_background(self, config):
+        """安装加载计时钩子并启动过期键清理与事件循环探测，lazy 模式下推迟到首个命令"""
+        if self._background_started:
+            return
+        self._background_started = True
+        self._install_load_hooks()
+        self._sweeper_task = asyncio.ensure_future(self._sweeper_loop())
+        if config.get("loop_probe_interval", 0.5) > 0:
+            self._loop_probe_task = asyncio.ensure_future(self._loop_probe())
+
     async def on_unload(self, event):
         # 注销所有命令
-        command.unregister(self._list_modules_handler)
-        command.unregister(self._list_adapters_handler)
-        command.unregister(self._list_all_handler)
-        command.unregister(self._restart_framework_handler)
-        command.unregister(self._reload_module_handler)
-        command.unregister(self._load_module_handler)
-        command.unregister(self._unload_module_handler)
-        command.unregister(self._start_adapter_handler)
-        command.unregister(self._stop_adapter_handler)
-        command.unregister(self._enable_adapter_handler)
-        command.unregister(self._disable_adapter_handler)
-        command.unregister(self._get_config_handler)
-        command.unregister(self._set_config_handler)
-        command.unregister(self._add_admin_handler)
-        command.unregister(self._remove_admin_handler)
-        command.unregister(self._list_admins_handler)
-        command.unregister(self._get_storage_handler)
-        command.unregister(self._set_storage_handler)
-        command.unregister(self._delete_storage_handler)
-        command.unregister(self._list_storage_handler)
-        command.unregister(self._enable_module_handler)
-        command.unregister(self._disable_module_handler)
-        command.unregister(self._restart_adapter_handler)
-        command.unregister(self._adapter_status_handler)
+        for handler in self._command_handlers.values():
+            command.unregister(handler)
+        self._command_handlers = {}
         
-        self.logger.info("AdminControl 模块已卸载")
-        return True
-
-    def _register_commands(self):
+        await self._config_writer.flush()
         
-        # ========== 列表命令 ==========
+        if self._registry_refresh is not None and not self._registry_refresh.done():
+            self._registry_refresh.cancel()
         
-        @command(["list-modules", "lm"], group="list", help="列出所有已注册的模块")
-        async def list_modules_handler(event):
-            await self._list_modules(event)
+        for task in self._usage_tasks.values():
+            task.cancel()
+        self._usage_tasks.clear()
         
-        @command(["list-adapters", "la"], group="list", help="列出所有已注册的适配器")
-        async def list_adapters_handler(event):
-            await self._list_adapters(event)
+        if self._watchdog_task is not None:
+            self._watchdog_task.cancel()
+            self._watchdog_task = None
         
-        @command(["list-all", "ls"], group="list", help="列出所有组件（模块和适配器）")
-        async def list_all_handler(event):
-            await self._list_all(event)
+        if self._sweeper_task is not None:
+            self._sweeper_task.cancel()
+            self._sweeper_task = None
         
-        # ========== 框架管理命令（需要管理员权限）==========
+        if self._loop_probe_task is not None:
+            self._loop_probe_task.cancel()
+            self._loop_probe_task = None
         
-        @command(["restart-framework", "restart"], group="framework", help="重启 ErisPulse 框架", permission=lambda e: self.is_admin(e))
-        async def restart_framework_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._restart_framework(event)
+        self._remove_load_hooks()
+        self._background_started = False
         
-        @command(["reload-module", "rm"], group="module", help="重新加载指定模块", usage="reload-module <模块名>", permission=lambda e: self.is_admin(e))
-        async def reload_module_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._reload_module(event)
+        # 重启排空期间暂存的事件无法在本实例中处理
+        dropped = self._event_hold.clear()
+        if dropped:
+            self.logger.warning(f"卸载时丢弃了 {dropped} 条暂存的事件")
         
-        @command(["load-module"], group="module", help="加载指定模块", usage="load-module <模块名>", permission=lambda e: self.is_admin(e))
-        async def load_module_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._load_module(event)
-        
-        @command(["unload-module", "um"], group="module", help="卸载指定模块", usage="unload-module <模块名>", permission=lambda e: self.is_admin(e))
-        async def unload_module_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._unload_module(event)
-        
-        @command(["start-adapter"], group="adapter", help="启动指定适配器", usage="start-adapter <适配器名>", permission=lambda e: self.is_admin(e))
-        async def start_adapter_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._start_adapter(event)
-        
-        @command(["stop-adapter"], group="adapter", help="停止指定适配器", usage="stop-adapter <适配器名>", permission=lambda e: self.is_admin(e))
-        async def stop_adapter_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._stop_adapter(event)
-        
-        @command(["enable-adapter"], group="adapter", help="启用指定适配器", usage="enable-adapter <适配器名>", permission=lambda e: self.is_admin(e))
-        async def enable_adapter_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._enable_adapter(event)
-        
-        @command(["disable-adapter"], group="adapter", help="禁用指定适配器", usage="disable-adapter <适配器名>", permission=lambda e: self.is_admin(e))
-        async def disable_adapter_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._disable_adapter(event)
-        
-        # ========== 配置管理命令（需要管理员权限）==========
-        
-        @command(["get-config"], group="config", help="获取模块/适配器配置", usage="get-config <配置键>", permission=lambda e: self.is_admin(e))
-        async def get_config_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._get_config(event)
-        
-        @command(["set-config"], group="config", help="设置模块/适配器配置", usage="set-config <配置键> <值>", permission=lambda e: self.is_admin(e))
-        async def set_config_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._set_config(event)
-        
-        @command(["add-admin"], group="admin", help="添加管理员", usage="add-admin <用户ID/群组ID>", permission=lambda e: self.is_admin(e))
-        async def add_admin_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._add_admin(event)
-        
-        @command(["remove-admin"], group="admin", help="移除管理员", usage="remove-admin <用户ID/群组ID>", permission=lambda e: self.is_admin(e))
-        async def remove_admin_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._remove_admin(event)
-        
-        @command(["list-admins"], group="admin", help="列出所有管理员")
-        async def list_admins_handler(event):
-            await self._list_admins(event)
-        
-        # ========== 存储管理命令（需要管理员权限）==========
-        
-        @command(["get-storage"], group="storage", help="获取存储值", usage="get-storage <键名>", permission=lambda e: self.is_admin(e))
-        async def get_storage_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._get_storage(event)
-        
-        @command(["set-storage"], group="storage", help="设置存储值", usage="set-storage <键名> <值>", permission=lambda e: self.is_admin(e))
-        async def set_storage_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
+        self.logger.info("AdminControl 模块已卸载")
+        return True
+
+    def _register_commands(self):
+        """按命令表注册全部命令"""
+        self._command_handlers = {}
+        for spec in self.COMMANDS:
+            self._command_handlers[spec.names[0]] = self._register_command(spec)
+
+    def _register_command(self, spec):
+        """注册单条命令，实现方法在调用时才解析"""
+        async def handler(event):
+            if not self._background_started:
+                self._start_background(self.sdk.config.getConfig("AdminControl") or {})
+            if spec.permission and not self.has_role(event, spec.permission, spec.group):
+                await event.reply(f"权限不足：此命令需要 {spec.permission} 角色")
                 return
-            await self._set_storage(event)
+            await getattr(self, spec.method)(event)
+        
+        handler.__name__ = handler.__qualname__ = f"{spec.method.lstrip('_')}_handler"
+        options = {"group": spec.group, "help": spec.help}
+        if spec.usage:
+            options["usage"] = spec.usage
+        if spec.permission:
+            options["permission"] = lambda e: self.has_role(e, spec.permission, spec.group)
+        return command(list(spec.names), **options)(self._instrument(spec.names[0])(handler))
+
+    # ========== 输出分页 ==========
+
+    @staticmethod
+    def _session_key(event):
+        """长输出分页缓存的会话键：同一平台、同一会话中的同一用户"""
+        return (event.get("platform"), event.get("group_id"), event.get("user_id"))
+
+    def _reply_budget(self, event):
+        """当前平台单条消息的字符数上限"""
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        budgets = config.get("reply_max_chars_by_platform", {})
+        return int(budgets.get(event.get("platform"), config.get("reply_max_chars", 2000)))
+
+    async def _send_output(self, event, text):
+        """
+        发送可能较长的命令输出
+        
+        按平台字符数上限在行边界切分；片段数不超过 reply_max_chunks 时依次发送（间隔
+        reply_interval 秒），否则缓存全部页面，仅发送第一页，后续通过 /next 或 /page N 查看。
+        """
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        budget = self._reply_budget(event)
+        # 预留页脚空间
+        chunks = split_text(text, max(budget - 40, 1))
+        max_chunks = int(config.get("reply_max_chunks", 3))
+        
+        if len(chunks) <= max_chunks:
+            interval = config.get("reply_interval", 0.5)
+            for i, chunk in enumerate(chunks):
+                if i:
+                    await asyncio.sleep(interval)
+                await event.reply(chunk)
+            return
         
-        @command(["delete-storage"], group="storage", help="删除存储值", usage="delete-storage <键名>", permission=lambda e: self.is_admin(e))
-        async def delete_storage_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._delete_storage(event)
+        key = self._session_key(event)
+        self._pager.store(key, chunks, config.get("page_ttl", 600))
+        await self._send_page(event, key, 0)
+
+    async def _send_page(self, event, key, index):
+        result = self._pager.page(key, index)
+        if result is None:
+            await event.reply("没有可翻页的输出，或分页已过期")
+            return
         
-        @command(["list-storage"], group="storage", help="列出所有存储键名")
-        async def list_storage_handler(event):
-            await self._list_storage(event)
+        page, index, total = result
+        if page is None:
+            await event.reply(f"错误: 页码超出范围（共 {total} 页）")
+            return
         
-        # ========== 模块管理命令（需要管理员权限）==========
+        footer = f"第 {index + 1}/{total} 页"
+        if index + 1 < total:
+            footer += "，使用 /next 或 /page <页码> 查看更多"
+        await event.reply(f"{page}\n━━━━━\n{footer}")
+
+    async def _next_page(self, event):
+        """查看下一页"""
+        key = self._session_key(event)
+        current = self._pager.current(key)
+        await self._send_page(event, key, 0 if current is None else current + 1)
+
+    async def _show_page(self, event):
+        """查看指定页"""
+        args = event.get_command_args()
+        if not args or not args[0].isdigit() or int(args[0]) < 1:
+            await event.reply("错误: 请指定页码\n用法: /page <页码>")
+            return
         
-        @command(["enable-module"], group="module", help="启用指定模块", usage="enable-module <模块名>", permission=lambda e: self.is_admin(e))
-        async def enable_module_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._enable_module(event)
+        await self._send_page(event, self._session_key(event), int(args[0]) - 1)
+
+    # ========== 列表命令实现 ==========
+
+    async def _refresh_registry(self):
+        """重建组件注册表快照，并发调用共享同一次重建"""
+        if self._registry_refresh is None or self._registry_refresh.done():
+            self._registry_refresh = asyncio.ensure_future(self._rebuild_registry())
+        return await asyncio.shield(self._registry_refresh)
+
+    async def _rebuild_registry(self):
+        modules, adapters = await asyncio.to_thread(scan_components)
         
-        @command(["disable-module"], group="module", help="禁用指定模块", usage="disable-module <模块名>", permission=lambda e: self.is_admin(e))
-        async def disable_module_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._disable_module(event)
+        loaded = set(self.sdk.module.list_loaded())
+        for name, entry in modules.items():
+            entry["loaded"] = name in loaded
+            entry["enabled"] = self.sdk.module.is_enabled(name)
         
-        # ========== 适配器管理命令（需要管理员权限）==========
+        items = self.sdk.adapter.list_items()
+        for name, entry in adapters.items():
+            entry["enabled"] = items.get(name, False)
+            entry["running"] = self._probe_adapter(name)
         
-        @command(["restart-adapter"], group="adapter", help="重启指定适配器", usage="restart-adapter <适配器名>", permission=lambda e: self.is_admin(e))
-        async def restart_adapter_handler(event):
-            if not self.is_admin(event):
-                await event.reply("权限不足：此命令需要管理员权限")
-                return
-            await self._restart_adapter(event)
-        
-        @command(["adapter-status"], group="adapter", help="查看适配器运行状态", usage="adapter-status [适配器名]")
-        async def adapter_status_handler(event):
-            await self._adapter_status(event)
-        
-        # 保存处理器引用以便后续注销
-        self._list_modules_handler = list_modules_handler
-        self._list_adapters_handler = list_adapters_handler
-        self._list_all_handler = list_all_handler
-        self._restart_framework_handler = restart_framework_handler
-        self._reload_module_handler = reload_module_handler
-        self._load_module_handler = load_module_handler
-        self._unload_module_handler = unload_module_handler
-        self._start_adapter_handler = start_adapter_handler
-        self._stop_adapter_handler = stop_adapter_handler
-        self._enable_adapter_handler = enable_adapter_handler
-        self._disable_adapter_handler = disable_adapter_handler
-        self._get_config_handler = get_config_handler
-        self._set_config_handler = set_config_handler
-        self._add_admin_handler = add_admin_handler
-        self._remove_admin_handler = remove_admin_handler
-        self._list_admins_handler = list_admins_handler
-        self._get_storage_handler = get_storage_handler
-        self._set_storage_handler = set_storage_handler
-        self._delete_storage_handler = delete_storage_handler
-        self._list_storage_handler = list_storage_handler
-        self._enable_module_handler = enable_module_handler
-        self._disable_module_handler = disable_module_handler
-        self._restart_adapter_handler = restart_adapter_handler
-        self._adapter_status_handler = adapter_status_handler
+        self._registry.replace(modules, adapters)
+        return self._registry
 
-    # ========== 列表命令实现 ==========
+    async def _get_registry(self):
+        """获取组件注册表快照，过期时自动重建"""
+        if self._registry.is_stale():
+            return await self._refresh_registry()
+        return self._registry
+
+    async def _refresh_registry_command(self, event):
+        """手动重建组件注册表快照"""
+        registry = await self._refresh_registry()
+        await event.reply(
+            f"成功: 组件注册表已刷新\n"
+            f"模块: {len(registry.modules)} 个\n"
+            f"适配器: {len(registry.adapters)} 个"
+        )
 
     async def _list_modules(self, event):
-        from ErisPulse.finders import ModuleFinder
-        
-        finder = ModuleFinder()
-        registered = finder.get_all_names()
-        loaded = self.sdk.module.list_loaded()
+        registry = await self._get_registry()
         
         lines = []
         lines.append("已注册模块列表")
         lines.append("━━━━━")
         lines.append("")
         
-        for module_name in registered:
-            module_info = finder.get_module_info(module_name)
-            version = module_info.get("version", "未知") if module_info else "未知"
-            package = module_info.get("package", "") if module_info else ""
-            is_loaded = module_name in loaded
-            status = "运行中" if is_loaded else "未加载"
+        for module_name, entry in registry.modules.items():
+            package = entry["package"]
+            status = "运行中" if entry["loaded"] else "未加载"
             
             lines.append(f"{module_name}")
-            lines.append(f"  版本: {version}")
+            lines.append(f"  版本: {entry['version']}")
             lines.append(f"  包:   {package if package else '本地'}")
             lines.append(f"  状态: {status}")
             lines.append("")
         
         lines.append("━━━━━")
-        lines.append(f"总计: {len(registered)} 个已注册模块")
+        lines.append(f"总计: {len(registry.modules)} 个已注册模块")
         
-        await event.reply("\n".join(lines))
+        await self._send_output(event, "\n".join(lines))
 
     async def _list_adapters(self, event):
-        from ErisPulse.finders import AdapterFinder
-        
-        finder = AdapterFinder()
-        registered = finder.get_all_names()
-        items = self.sdk.adapter.list_items()
+        registry = await self._get_registry()
         
         lines = []
         lines.append("已注册适配器列表")
         lines.append("━━━━━")
         lines.append("")
         
-        for adapter_name in registered:
-            adapter_info = finder.get_adapter_info(adapter_name)
-            version = adapter_info.get("version", "未知") if adapter_info else "未知"
-            package = adapter_info.get("package", "") if adapter_info else ""
-            is_enabled = items.get(adapter_name, False)
-            status = "已启用" if is_enabled else "已禁用"
+        for adapter_name, entry in registry.adapters.items():
+            package = entry["package"]
+            status = "已启用" if entry["enabled"] else "已禁用"
             
             lines.append(f"{adapter_name}")
-            lines.append(f"  版本: {version}")
+            lines.append(f"  版本: {entry['version']}")
             lines.append(f"  包:   {package if package else '本地'}")
             lines.append(f"  状态: {status}")
             lines.append("")
         
         lines.append("━━━━━")
-        lines.append(f"总计: {len(registered)} 个已注册适配器")
+        lines.append(f"总计: {len(registry.adapters)} 个已注册适配器")
         
-        await event.reply("\n".join(lines))
+        await self._send_output(event, "\n".join(lines))
 
     async def _list_all(self, event):
-        from ErisPulse.finders import ModuleFinder, AdapterFinder
-        
-        module_finder = ModuleFinder()
-        adapter_finder = AdapterFinder()
+        registry = await self._get_registry()
         
-        modules = module_finder.get_all_names()
-        adapters = adapter_finder.get_all_names()
+        # 已加载/已启用状态直接取自内存，包含未通过 entry-point 注册的本地组件
         loaded_modules = self.sdk.module.list_loaded()
-        adapter_items = self.sdk.adapter.list_items()
-        
-        enabled_adapters = [k for k, v in adapter_items.items() if v]
+        enabled_adapters = [k for k, v in self.sdk.adapter.list_items().items() if v]
         
         lines = []
         lines.append("ErisPulse 组件概览")
         lines.append("━━━━━")
         lines.append("")
         lines.append("模块")
-        lines.append(f"  已注册: {len(modules)} 个")
+        lines.append(f"  已注册: {len(registry.modules)} 个")
         lines.append(f"  已加载: {len(loaded_modules)} 个")
         lines.append("")
         lines.append("适配器")
-        lines.append(f"  已注册: {len(adapters)} 个")
+        lines.append(f"  已注册: {len(registry.adapters)} 个")
         lines.append(f"  已启用: {len(enabled_adapters)} 个")
         lines.append("")
         lines.append("━━━━━")
@@ -377,50 +1756,808 @@ class Main(BaseModule):
         if not enabled_adapters:
             lines.append("  (无)")
         
-        await event.reply("\n".join(lines))
+        await self._send_output(event, "\n".join(lines))
 
     # ========== 框架管理命令实现 ==========
 
     async def _restart_framework(self, event):
-        await event.reply("正在重启 ErisPulse 框架...")
+        usage = "用法: /restart-framework [--drain] [--timeout 秒数]"
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        try:
+            args, options = parse_options(
+                event.get_command_args(), value_options=("--timeout",), flag_options=("--drain",)
+            )
+            timeout = float(options.get("--timeout", config.get("drain_timeout", 30)))
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        drain = options.get("--drain", False) or config.get("drain_on_restart", False)
+        if drain:
+            await event.reply(f"正在排空进行中的任务（最长 {timeout:g}s），期间暂停处理新事件...")
+        else:
+            await event.reply("正在重启 ErisPulse 框架...")
+        
+        restarted = False
+        holding = False
+        try:
+            if drain:
+                self._event_hold.hold(None, max(1, int(config.get("drain_buffer_size", 1000))))
+                holding = True
+                drained, remaining, elapsed = await self._drain_tasks(timeout, config.get("drain_settle", 1))
+                await self._flush_persistence()
+                
+                lines = []
+                lines.append(f"排空完成: {drained} 个任务已结束，耗时 {elapsed:.2f}s")
+                if remaining:
+                    lines.append(f"{remaining} 个任务仍在运行（如适配器连接等长期任务），将在重启时关闭")
+                held = self._event_hold.pending(None)
+                if held:
+                    lines.append(f"排空期间收到 {held} 条新事件，重启后不会处理")
+                lines.append("已保存存储与配置，正在重启 ErisPulse 框架...")
+                await event.reply("\n".join(lines))
+            
+            from ErisPulse import restart
+            try:
+                await restart()
+                restarted = True
+            except Exception as e:
+                self._log_error(f"重启框架时出错: {e}")
+                await event.reply(f"错误: 重启失败\n{str(e)}")
+        finally:
+            if holding and not restarted:
+                # 未能重启（出错、被取消等）时恢复处理并重放排空期间暂存的事件
+                await self._event_hold.release(None)
+
+    async def _drain_tasks(self, timeout, settle):
+        """
+        等待进行中的任务结束
+        
+        新事件已被暂存，不会再产生新的处理器任务；已有任务（处理器、发送任务等）结束后，
+        若连续 settle 秒没有任务结束，剩余的视为长期运行的任务，不再等待。
+        
+        :return: (已结束的任务数, 仍在运行的任务数, 耗时)
+        """
+        own = {
+            asyncio.current_task(), self._watchdog_task, self._sweeper_task,
+            self._loop_probe_task, self._registry_refresh, *self._usage_tasks.values(),
+        }
+        seen = set()
+        pending = set()
+        started = last_change = time.monotonic()
+        while True:
+            # 进行中的任务可能创建新任务（如发送回复），一并等待
+            for task in asyncio.all_tasks():
+                if task not in seen and task not in own and not task.done():
+                    seen.add(task)
+                    pending.add(task)
+            if not pending:
+                break
+            
+            now = time.monotonic()
+            wait = min(settle, started + timeout - now)
+            if wait <= 0:
+                break
+            done, pending = await asyncio.wait(pending, timeout=wait, return_when=asyncio.FIRST_COMPLETED)
+            now = time.monotonic()
+            if done:
+                last_change = now
+            elif now - last_change >= settle:
+                break
+        return len(seen) - len(pending), len(pending), time.monotonic() - started
+
+    async def _flush_persistence(self):
+        """将存储与配置中尚未写入的数据落盘"""
+        await self._config_writer.flush()
+        for target, names in ((self.sdk.storage, ("flush", "force_save")), (self.sdk.config, ("force_save", "flush"))):
+            for name in names:
+                flush = getattr(target, name, None)
+                if flush is None:
+                    continue
+                try:
+                    result = flush()
+                    if asyncio.iscoroutine(result):
+                        await result
+                except Exception as e:
+                    self._log_error(f"保存数据时出错: {e}")
+                break
+
+    @staticmethod
+    def _collect_dependents(dependencies, root):
+        """收集直接或间接依赖 root 的全部模块（包含 root 本身）"""
+        dependents = {}
+        for name, deps in dependencies.items():
+            for dep in deps:
+                dependents.setdefault(dep, set()).add(name)
+        
+        collected = {root}
+        stack = [root]
+        while stack:
+            for name in dependents.get(stack.pop(), ()):
+                if name not in collected:
+                    collected.add(name)
+                    stack.append(name)
+        return collected
+
+    def _install_load_hooks(self):
+        """在模块/适配器管理器上安装计时包装，记录所有加载、卸载与启动的耗时"""
+        targets = (
+            (self.sdk.module, "load", "module"),
+            (self.sdk.module, "unload", "module"),
+            (self.sdk.adapter, "startup", "adapter"),
+        )
+        for manager, attr, kind in targets:
+            original = getattr(manager, attr, None)
+            if original is None:
+                continue
+            patched = attr in vars(manager)
+            hook = self._load_hook(original, kind, attr)
+            try:
+                setattr(manager, attr, hook)
+            except AttributeError:
+                continue
+            self._load_hooks.append((manager, attr, original, hook, patched))
+
+    def _remove_load_hooks(self):
+        for manager, attr, original, hook, patched in reversed(self._load_hooks):
+            # 其他模块在此之后又包装了同一方法时不做还原，避免破坏其包装
+            if getattr(manager, attr, None) is not hook:
+                continue
+            if patched:
+                setattr(manager, attr, original)
+            else:
+                delattr(manager, attr)
+        self._load_hooks = []
+
+    def _load_hook(self, original, kind, operation):
+        @functools.wraps(original)
+        async def hook(*args, **kwargs):
+            target = args[0] if args else next(iter(kwargs.values()), None)
+            started = time.perf_counter()
+            ok = False
+            try:
+                result = await original(*args, **kwargs)
+                ok = result is not False
+                return result
+            finally:
+                self._record_load(kind, operation, target, time.perf_counter() - started, ok)
+        return hook
+
+    def _record_load(self, kind, operation, target, seconds, ok):
+        if isinstance(target, (list, tuple)):
+            if len(target) != 1:
+                # 批量启动无法区分各适配器的耗时，整体记录
+                target = f"(批量 {len(target)} 个)"
+            else:
+                target = target[0]
+        elif target is None:
+            target = "(全部)"
+        
+        priority = None
+        if kind == "module" and operation == "load" and ok:
+            priority = self._module_priority(target)
+        self._metrics.observe_target(kind, target, operation, seconds, ok, priority)
+
+    def _module_priority(self, module_name):
+        """已加载模块的加载优先级，无法获取时返回 None"""
+        strategy_of = getattr(type(getattr(self.sdk, module_name, None)), "get_load_strategy", None)
+        if strategy_of is None:
+            return None
+        try:
+            strategy = strategy_of()
+        except Exception:
+            return None
+        if isinstance(strategy, dict):
+            return strategy.get("priority", 0)
+        return getattr(strategy, "priority", 0)
+
+    async def _startup_report(self, event):
+        """按耗时排序的组件加载记录、各加载优先级的耗时与并行/懒加载可节省的时间"""
+        usage = "用法: /startup-report [--top N]"
+        try:
+            args, options = parse_options(event.get_command_args(), value_options=("--top",))
+            top = int(options.get("--top", 10))
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        metrics = self._metrics
+        if not metrics.target_last:
+            await event.reply("暂无加载记录（本模块加载后才开始记录）")
+            return
+        
+        registry = await self._get_registry()
+        dependencies = registry.module_dependencies()
+        loads = {name: record for name, record in metrics.last_of("module", "load").items() if record["ok"]}
         
-        from ErisPulse import restart
+        lines = []
+        lines.append("加载耗时报告")
+        lines.append(f"记录开始于 {time.strftime('%m-%d %H:%M:%S', time.localtime(metrics.targets_since))}")
+        lines.append("━━━━━")
+        lines.append(f"最慢的 {top} 项（最近一次）:")
+        ranked = sorted(metrics.target_last.items(), key=lambda item: -item[1]["seconds"])
+        for (kind, name, operation), record in ranked[:top]:
+            details = [record["source"]]
+            if record["priority"] is not None:
+                details.append(f"优先级 {record['priority']}")
+            if not record["ok"]:
+                details.append("失败")
+            lines.append(
+                f"  {TARGET_KIND_LABELS.get(kind, kind)} {name} {TARGET_OPERATION_LABELS.get(operation, operation)}: "
+                f"{record['seconds']:.3f}s（{'，'.join(details)}）"
+            )
+        
+        if loads:
+            by_priority = {}
+            for name, record in loads.items():
+                by_priority.setdefault(record["priority"], {})[name] = record["seconds"]
+            
+            lines.append("━━━━━")
+            lines.append("模块加载按优先级统计（框架按优先级从高到低依次加载）:")
+            serial_total = parallel_total = 0.0
+            for priority in sorted(by_priority, key=lambda p: (p is None, -(p or 0))):
+                durations = by_priority[priority]
+                serial = sum(durations.values())
+                parallel = critical_path(durations, dependencies)
+                serial_total += serial
+                parallel_total += parallel
+                label = "未知" if priority is None else priority
+                lines.append(
+                    f"  优先级 {label}: {len(durations)} 个，串行 {serial:.3f}s，"
+                    f"按依赖并行 {parallel:.3f}s（可节省 {serial - parallel:.3f}s）"
+                )
+            lines.append(f"同优先级内按依赖并行加载合计可节省约 {serial_total - parallel_total:.3f}s")
+            
+            lazy_candidates = sorted(
+                ((name, record["seconds"]) for name, record in loads.items() if name != "AdminControl"),
+                key=lambda item: -item[1],
+            )[:top]
+            if lazy_candidates:
+                saved = sum(seconds for _, seconds in lazy_candidates)
+                lines.append(
+                    f"将最慢的 {len(lazy_candidates)} 个模块改为懒加载可将启动时间缩短约 {saved:.3f}s"
+                    "（加载耗时推迟到首次使用时）:"
+                )
+                lines.append("  " + "，".join(f"{name} {seconds:.3f}s" for name, seconds in lazy_candidates))
+        
+        if not any(record["source"] == "框架/其他模块" for record in loads.values()):
+            lines.append("━━━━━")
+            lines.append("未记录到框架启动时的模块加载：本模块需以 eager 模式（优先级 100）先于其他模块加载")
+        
+        await self._send_output(event, "\n".join(lines))
+
+    async def _timed_module_call(self, operation, module_name):
+        """执行模块加载（load）/卸载（unload）并计时，返回 (模块名, 是否成功, 耗时, 错误信息)"""
+        func = self.sdk.module.load if operation == "load" else self.sdk.module.unload
+        started = time.perf_counter()
         try:
-            await restart()
+            ok, error = bool(await func(module_name)), ""
         except Exception as e:
-            self.logger.error(f"重启框架时出错: {e}")
-            await event.reply(f"错误: 重启失败\n{str(e)}")
+            self._log_error(f"处理模块 {module_name} 时出错: {e}")
+            ok, error = False, str(e)
+        elapsed = time.perf_counter() - started
+        return module_name, ok, elapsed, error
 
-    async def _reload_module(self, event):
-        """重新加载指定模块"""
+    async def _reload_modules(self, levels, dependencies):
+        """
+        按依赖层级重新加载模块
+        
+        按层级逆序卸载、顺序加载，同一层级内的模块并发执行。卸载阶段出现失败时
+        停止并重新加载已卸载的模块（回滚）；加载阶段出现失败时跳过依赖它的模块。
+        
+        :return: ({模块名: 结果}, 是否发生回滚)
+        """
+        results = {
+            name: {"status": "未执行", "detail": "", "unload": None, "load": None}
+            for level in levels for name in level
+        }
+        
+        # 卸载阶段：依赖方先于被依赖方卸载
+        unloaded = set()
+        rolled_back = False
+        for level in reversed(levels):
+            outcomes = await asyncio.gather(
+                *(self._timed_module_call("unload", name) for name in level)
+            )
+            for name, ok, elapsed, error in outcomes:
+                results[name]["unload"] = elapsed
+                if ok:
+                    unloaded.add(name)
+                    self._registry.update_module(name, loaded=False)
+                else:
+                    results[name]["status"] = "失败"
+                    results[name]["detail"] = f"卸载失败 {error}".strip()
+                    rolled_back = True
+            if rolled_back:
+                break
+        
+        # 加载阶段：被依赖方先于依赖方加载；回滚时只重新加载已卸载的模块
+        failed = set()
+        for level in levels:
+            runnable = []
+            for name in level:
+                if name not in unloaded:
+                    continue
+                if dependencies.get(name, set()) & failed:
+                    failed.add(name)
+                    results[name]["status"] = "跳过"
+                    results[name]["detail"] = "依赖的模块加载失败"
+                else:
+                    runnable.append(name)
+            
+            outcomes = await asyncio.gather(
+                *(self._timed_module_call("load", name) for name in runnable)
+            )
+            for name, ok, elapsed, error in outcomes:
+                results[name]["load"] = elapsed
+                self._registry.update_module(name, loaded=ok)
+                if ok:
+                    results[name]["status"] = "已回滚" if rolled_back else "成功"
+                else:
+                    failed.add(name)
+                    results[name]["status"] = "失败"
+                    results[name]["detail"] = f"加载失败 {error}".strip()
+        
+        return results, rolled_back
+
+    async def _admin_stats(self, event):
+        """查看命令耗时统计或导出 Prometheus 文本快照"""
         args = event.get_command_args()
-        if not args:
-            await event.reply("错误: 请指定模块名称\n用法: /reload-module <模块名>")
+        
+        if args and args[0] == "--export":
+            # 只写入配置的导出路径，不接受聊天中指定的路径，避免覆盖任意文件
+            if len(args) > 1:
+                await event.reply("错误: 导出路径由配置项 metrics_file 指定，不能在命令中指定\n用法: /admin-stats --export")
+                return
+            config = self.sdk.config.getConfig("AdminControl") or {}
+            path = config.get("metrics_file", "admincontrol_metrics.prom")
+            text = self._metrics.to_prometheus()
+            try:
+                await asyncio.to_thread(self._write_text, path, text)
+            except OSError as e:
+                self._log_error(f"导出统计数据到 {path} 时出错: {e}")
+                await event.reply(f"错误: 导出失败\n{str(e)}")
+                return
+            await event.reply(f"成功: 统计数据已导出到 {path}")
             return
         
-        module_name = args[0]
+        def fmt(seconds):
+            return f"{seconds * 1000:.1f}ms"
         
-        if not self.sdk.module.is_loaded(module_name):
-            await event.reply(f"未加载: 模块 '{module_name}'")
+        lines = []
+        if args:
+            name = args[0]
+            stats = self._metrics.commands.get(name)
+            if stats is None:
+                await event.reply(f"未找到: 命令 '{name}' 暂无统计数据")
+                return
+            latency = stats.latency
+            lines.append(f"命令统计: {name}")
+            lines.append("━━━━━")
+            lines.append(f"调用: {stats.calls} 次")
+            lines.append(f"出错: {stats.errors} 次")
+            lines.append(f"p50: {fmt(latency.quantile(0.5))}")
+            lines.append(f"p95: {fmt(latency.quantile(0.95))}")
+            lines.append(f"p99: {fmt(latency.quantile(0.99))}")
+            lines.append(f"最大: {fmt(latency.max)}")
+        else:
+            lines.append("管理命令统计")
+            lines.append("━━━━━")
+            commands = sorted(self._metrics.commands.items(), key=lambda item: -item[1].calls)
+            for name, stats in commands:
+                latency = stats.latency
+                lines.append(
+                    f"{name}: {stats.calls} 次 / 出错 {stats.errors} 次 / "
+                    f"p50 {fmt(latency.quantile(0.5))} / p95 {fmt(latency.quantile(0.95))} / "
+                    f"p99 {fmt(latency.quantile(0.99))}"
+                )
+            if not commands:
+                lines.append("  (无)")
+            
+            if self._metrics.targets:
+                lines.append("")
+                lines.append("生命周期操作耗时（按总耗时排序，前 10 项）")
+                lines.append("━━━━━")
+                targets = sorted(self._metrics.targets.items(), key=lambda item: -item[1].total)
+                for (kind, name, operation), latency in targets[:10]:
+                    lines.append(
+                        f"{kind} {name} {operation}: {latency.count} 次 / "
+                        f"p50 {fmt(latency.quantile(0.5))} / 最大 {fmt(latency.max)}"
+                    )
+        
+        await self._send_output(event, "\n".join(lines))
+
+    async def _loop_probe(self):
+        """
+        事件循环延迟探测
+        
+        定期休眠固定间隔，实际唤醒时间超出间隔的部分即为事件循环被阻塞的时间；
+        每 LOOP_TASK_SAMPLE_EVERY 次探测顺带登记一次新任务，用于估算 /tasks 中的存活时间。
+        """
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        interval = config.get("loop_probe_interval", 0.5)
+        loop = asyncio.get_running_loop()
+        ticks = 0
+        while True:
+            started = loop.time()
+            await asyncio.sleep(interval)
+            lag = max(0.0, loop.time() - started - interval)
+            self._metrics.loop_lag.observe(lag)
+            self._loop_lag_recent.append(lag)
+            ticks += 1
+            if ticks % self.LOOP_TASK_SAMPLE_EVERY == 0:
+                self._snapshot_tasks()
+
+    def _snapshot_tasks(self):
+        """返回当前所有未完成的任务，并记录新任务首次被观察到的时间"""
+        now = time.monotonic()
+        tasks = [task for task in asyncio.all_tasks() if not task.done()]
+        for task in tasks:
+            self._task_seen.setdefault(task, now)
+        return tasks, now
+
+    async def _loop_stats(self, event):
+        """查看事件循环延迟与任务数"""
+        def fmt(seconds):
+            return f"{seconds * 1000:.1f}ms"
+        
+        tasks, _ = self._snapshot_tasks()
+        histogram = self._metrics.loop_lag
+        recent = self._loop_lag_recent
+        
+        lines = []
+        lines.append("事件循环状态")
+        lines.append("━━━━━")
+        if recent:
+            lines.append(f"当前延迟: {fmt(recent[-1])}")
+            lines.append(f"最近 {len(recent)} 次探测最大延迟: {fmt(max(recent))}")
+            lines.append(
+                f"累计 {histogram.count} 次探测: p50 {fmt(histogram.quantile(0.5))} / "
+                f"p95 {fmt(histogram.quantile(0.95))} / p99 {fmt(histogram.quantile(0.99))} / "
+                f"最大 {fmt(histogram.max)}"
+            )
+        elif self._loop_probe_task is None:
+            lines.append("延迟探测未启用（loop_probe_interval 为 0）")
+        else:
+            lines.append("延迟探测尚无数据")
+        lines.append(f"未完成任务: {len(tasks)} 个")
+        
+        await self._send_output(event, "\n".join(lines))
+
+    async def _tasks(self, event):
+        """按所属组件列出 asyncio 任务，包含存活时间与当前执行位置"""
+        args = event.get_command_args()
+        target = args[0].lower() if args else None
+        
+        registry = await self._get_registry()
+        owners = registry.owners()
+        tasks, now = self._snapshot_tasks()
+        current = asyncio.current_task()
+        
+        groups = {}
+        for task in tasks:
+            if task is current:
+                continue
+            owner, location = describe_task(task, owners)
+            if target and target not in owner.lower():
+                continue
+            age = now - self._task_seen.get(task, now)
+            groups.setdefault(owner, []).append((age, task.get_name(), location))
+        
+        lines = []
+        lines.append(f"asyncio 任务{f'（匹配: {args[0]}）' if target else ''}")
+        lines.append("━━━━━")
+        for owner, entries in sorted(groups.items(), key=lambda item: -len(item[1])):
+            lines.append(f"{owner} ({len(entries)} 个)")
+            for age, name, location in sorted(entries, key=lambda entry: -entry[0]):
+                lines.append(f"  {name} 存活≥{age:.0f}s {location}")
+        if not groups:
+            lines.append("  (无)")
+        lines.append("━━━━━")
+        lines.append("存活时间从任务首次被观察到时开始计算（延迟探测每 20 次登记一次任务）")
+        
+        await self._send_output(event, "\n".join(lines))
+
+    async def _profile(self, event):
+        """在时间窗口内运行 cProfile，保存数据文件并回复累计耗时最高的函数"""
+        usage = "用法: /profile <秒数> [--module 组件名] [--top N]"
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        max_seconds = config.get("profile_max_seconds", 120)
+        try:
+            args, options = parse_options(
+                event.get_command_args(), value_options=("--module", "--top")
+            )
+            seconds = float(args[0]) if args else None
+            top = int(options.get("--top", 20))
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
             return
         
-        await event.reply(f"正在重新加载模块 '{module_name}'...")
+        if seconds is None or not 0 < seconds <= max_seconds or top < 1:
+            await event.reply(f"错误: 采集时长必须在 0 到 {max_seconds} 秒之间\n{usage}")
+            return
+        
+        component = options.get("--module")
+        package = None
+        if component:
+            registry = await self._get_registry()
+            entry = registry.modules.get(component) or registry.adapters.get(component)
+            if entry is None or not entry["module"]:
+                await event.reply(f"未找到: 模块或适配器 '{component}'")
+                return
+            package = entry["module"].split(".")[0]
+        
+        if self._profiling:
+            await event.reply("忙碌: 已有正在进行的性能采集，请稍后再试")
+            return
         
+        import cProfile
+        profiler = cProfile.Profile()
+        self._profiling = True
+        await event.reply(f"正在采集 {seconds:g} 秒性能数据...")
         try:
-            # 先卸载
-            success = await self.sdk.module.unload(module_name)
-            if success:
-                # 再加载
-                success = await self.sdk.module.load(module_name)
-                if success:
-                    await event.reply(f"成功: 模块 '{module_name}' 已重新加载")
-                else:
-                    await event.reply(f"失败: 模块 '{module_name}' 加载失败")
-            else:
-                await event.reply(f"失败: 模块 '{module_name}' 卸载失败")
-        except Exception as e:
-            self.logger.error(f"重新加载模块 {module_name} 时出错: {e}")
-            await event.reply(f"错误: {str(e)}")
+            # 事件循环在单线程中运行，窗口内循环执行的所有回调都会被记录
+            profiler.enable()
+            try:
+                await asyncio.sleep(seconds)
+            finally:
+                profiler.disable()
+        finally:
+            self._profiling = False
+        
+        directory = config.get("profile_dir", "profiles")
+        path = f"{directory}/profile-{time.strftime('%Y%m%d-%H%M%S')}.prof"
+        try:
+            total, rows = await asyncio.to_thread(profile_top, profiler, path, top, package)
+        except OSError as e:
+            self._log_error(f"保存性能数据时出错: {e}")
+            await event.reply(f"错误: 保存性能数据失败\n{str(e)}")
+            return
+        
+        lines = []
+        lines.append(f"性能采集结果（{seconds:g}s，记录的总耗时 {total:.3f}s）")
+        if component:
+            lines.append(f"范围: {component} ({package})")
+        lines.append("━━━━━")
+        lines.append("累计 / 自身 / 调用次数 / 函数")
+        for cumulative, own, calls, description in rows:
+            lines.append(f"{cumulative:.3f}s / {own:.3f}s / {calls} / {description}")
+        if not rows:
+            lines.append("  (窗口内没有相关函数被调用)")
+        lines.append("━━━━━")
+        lines.append(f"完整数据已保存到 {path}")
+        
+        await self._send_output(event, "\n".join(lines))
+
+    def _start_tracing(self):
+        """未在追踪内存分配时开启追踪，返回是否由本次调用开启"""
+        import tracemalloc
+        if tracemalloc.is_tracing():
+            return False
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        tracemalloc.start(max(1, int(config.get("mem_trace_frames", 5))))
+        return True
+
+    @staticmethod
+    def _take_mem_snapshot():
+        """回收垃圾后获取内存快照，排除 tracemalloc 与导入系统自身的分配"""
+        import gc
+        import tracemalloc
+        gc.collect()
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        ))
+
+    async def _mem_owners(self):
+        registry = await self._get_registry()
+        return registry.owners()
+
+    async def _mem_snapshot(self, event):
+        """开启内存分配追踪并记录基准快照，--stop 时停止追踪"""
+        import tracemalloc
+        args, options = parse_options(event.get_command_args(), flag_options=("--stop",))
+        if options.get("--stop"):
+            self._mem_baseline = None
+            if not tracemalloc.is_tracing():
+                await event.reply("内存追踪未开启")
+                return
+            tracemalloc.stop()
+            await event.reply("成功: 已停止内存追踪并清除基准快照")
+            return
+        
+        started = self._start_tracing()
+        owners = await self._mem_owners()
+        snapshot = await asyncio.to_thread(self._take_mem_snapshot)
+        self._mem_baseline = (snapshot, time.time())
+        totals = await asyncio.to_thread(
+            attribute_allocations, snapshot.statistics("traceback"), owners
+        )
+        
+        lines = []
+        lines.append("内存快照")
+        lines.append("━━━━━")
+        total = sum(size for size, _ in totals.values())
+        for owner, (size, count) in sorted(totals.items(), key=lambda item: -item[1][0])[:10]:
+            lines.append(f"{owner}: {format_size(size)} ({count} 块)")
+        if not totals:
+            lines.append("  (无)")
+        lines.append("━━━━━")
+        lines.append(f"已追踪: {format_size(total)}，已记录为基准快照，使用 /mem-diff 对比")
+        if started:
+            lines.append("内存追踪刚刚开启，快照只包含此后的分配；追踪期间内存分配会变慢，完成后请使用 /mem-snapshot --stop")
+        
+        await self._send_output(event, "\n".join(lines))
+
+    async def _mem_diff(self, event):
+        """与基准快照对比，按模块/适配器汇总内存增长"""
+        import tracemalloc
+        usage = "用法: /mem-diff [--top N] [--reset]"
+        try:
+            args, options = parse_options(
+                event.get_command_args(), value_options=("--top",), flag_options=("--reset",)
+            )
+            top = int(options.get("--top", 10))
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        if self._mem_baseline is None or not tracemalloc.is_tracing():
+            await event.reply("错误: 尚无基准快照，请先使用 /mem-snapshot")
+            return
+        
+        baseline, taken_at = self._mem_baseline
+        owners = await self._mem_owners()
+        snapshot = await asyncio.to_thread(self._take_mem_snapshot)
+        
+        def compare():
+            totals = attribute_allocations(snapshot.compare_to(baseline, "traceback"), owners, diff=True)
+            sites = snapshot.compare_to(baseline, "lineno")[:5]
+            return totals, sites
+        
+        totals, sites = await asyncio.to_thread(compare)
+        if options.get("--reset"):
+            self._mem_baseline = (snapshot, time.time())
+        
+        lines = []
+        lines.append(f"内存变化（相对 {time.time() - taken_at:.0f}s 前的基准快照）")
+        lines.append("━━━━━")
+        changed = [item for item in totals.items() if item[1][0]]
+        for owner, (size, count) in sorted(changed, key=lambda item: -item[1][0])[:top]:
+            lines.append(f"{owner}: {format_size_delta(size)} ({count:+d} 块)")
+        if not changed:
+            lines.append("  (无变化)")
+        lines.append("━━━━━")
+        lines.append("增长最多的分配位置:")
+        for stat in sites:
+            frame = stat.traceback[-1]
+            location = "/".join(frame.filename.replace("\\", "/").rsplit("/", 2)[-2:])
+            lines.append(f"  {location}:{frame.lineno} {format_size_delta(stat.size_diff)}")
+        lines.append(f"合计: {format_size_delta(sum(size for size, _ in totals.values()))}")
+        if options.get("--reset"):
+            lines.append("已将当前快照设为新的基准")
+        
+        await self._send_output(event, "\n".join(lines))
+
+    @staticmethod
+    def _write_text(path, text):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    async def _reload_module(self, event):
+        """按依赖顺序重新加载一个或多个模块"""
+        usage = "用法: /reload-module <模块名...> | --dependents <模块名> [--check-leak]"
+        try:
+            names, options = parse_options(
+                event.get_command_args(), value_options=("--dependents",), flag_options=("--check-leak",)
+            )
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        registry = await self._get_registry()
+        dependencies = registry.module_dependencies()
+        
+        root = options.get("--dependents")
+        if root:
+            names.extend(self._collect_dependents(dependencies, root))
+        if not names:
+            await event.reply(f"错误: 请指定模块名称\n{usage}")
+            return
+        
+        check_leak = options.get("--check-leak", False)
+        if check_leak:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                # 追踪开启前的分配不在快照中，其释放也不可见，直接对比会把新模块的全部占用算作增长
+                await event.reply(
+                    "错误: 内存追踪未开启，无法可靠地检查泄漏\n"
+                    "请先使用 /mem-snapshot 开启追踪，并在追踪期间重新加载一次该模块，"
+                    "使其持有的内存都被追踪后再使用 --check-leak"
+                )
+                return
+        
+        names = list(dict.fromkeys(names))
+        # 正在重新加载中的模块可能处于已卸载状态，仍视为目标以便加入进行中的操作
+        targets = {
+            name for name in names
+            if self.sdk.module.is_loaded(name) or self._flights.operation(("模块", name)) == "重新加载"
+        }
+        not_loaded = [name for name in names if name not in targets]
+        if not targets:
+            await event.reply(f"未加载: 模块 {', '.join(repr(n) for n in not_loaded)}")
+            return
+        
+        try:
+            levels = dependency_levels(targets, dependencies)
+        except ValueError as e:
+            await event.reply(f"错误: {e}")
+            return
+        
+        try:
+            self._flights.check([("模块", name) for name in targets], "重新加载")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
+        
+        await event.reply(f"正在重新加载 {len(targets)} 个模块...")
+        
+        keys = [("模块", name) for name in sorted(targets)]
+        
+        def reload():
+            return self._reload_modules(levels, dependencies)
+        
+        try:
+            if check_leak:
+                before = await asyncio.to_thread(self._take_mem_snapshot)
+            started = time.perf_counter()
+            results, rolled_back = await self._flights.run(keys, "重新加载", reload)
+            elapsed = time.perf_counter() - started
+            if check_leak:
+                after = await asyncio.to_thread(self._take_mem_snapshot)
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
+        
+        def fmt(seconds):
+            return "-" if seconds is None else f"{seconds:.2f}s"
+        
+        lines = []
+        lines.append("模块重新加载结果")
+        lines.append("━━━━━")
+        lines.append(f"加载顺序: {' → '.join(', '.join(level) for level in levels)}")
+        lines.append("━━━━━")
+        for level in levels:
+            for name in level:
+                result = results[name]
+                detail = f" {result['detail']}" if result["detail"] else ""
+                lines.append(
+                    f"{name}: {result['status']}{detail} "
+                    f"(卸载 {fmt(result['unload'])} / 加载 {fmt(result['load'])})"
+                )
+        lines.append("━━━━━")
+        if rolled_back:
+            lines.append("卸载阶段失败，已重新加载已卸载的模块")
+        if not_loaded:
+            lines.append(f"未加载，已忽略: {', '.join(not_loaded)}")
+        succeeded = sum(1 for result in results.values() if result["status"] == "成功")
+        lines.append(f"成功: {succeeded} 个 / 共 {len(results)} 个，总耗时 {elapsed:.2f}s")
+        
+        if check_leak:
+            owners = (await self._get_registry()).owners()
+            totals = await asyncio.to_thread(
+                attribute_allocations, after.compare_to(before, "traceback"), owners, True
+            )
+            lines.append("━━━━━")
+            lines.append("重新加载前后仍被持有的内存变化:")
+            for name in sorted(targets):
+                size, count = totals.get(f"模块 {name}", (0, 0))
+                lines.append(f"  {name}: {format_size_delta(size)} ({count:+d} 块)")
+            lines.append(f"  合计（全部组件）: {format_size_delta(sum(size for size, _ in totals.values()))}")
+            lines.append("单次重新加载的增长可能来自缓存预热，多次重复后持续增长才说明存在泄漏")
+        
+        await self._send_output(event, "\n".join(lines))
 
     async def _load_module(self, event):
         args = event.get_command_args()
@@ -429,6 +2566,13 @@ class Main(BaseModule):
             return
         
         module_name = args[0]
+        keys = [("模块", module_name)]
+        
+        try:
+            self._flights.check(keys, "加载")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
         
         if self.sdk.module.is_loaded(module_name):
             await event.reply(f"已加载: 模块 '{module_name}'")
@@ -441,13 +2585,18 @@ class Main(BaseModule):
         await event.reply(f"正在加载模块 '{module_name}'...")
         
         try:
-            success = await self.sdk.module.load(module_name)
+            success = await self._flights.run(
+                keys, "加载", lambda: self.sdk.module.load(module_name)
+            )
             if success:
+                self._registry.update_module(module_name, loaded=True)
                 await event.reply(f"成功: 模块 '{module_name}' 已加载")
             else:
                 await event.reply(f"失败: 模块 '{module_name}' 加载失败")
+        except TargetBusy as e:
+            await event.reply(str(e))
         except Exception as e:
-            self.logger.error(f"加载模块 {module_name} 时出错: {e}")
+            self._log_error(f"加载模块 {module_name} 时出错: {e}")
             await event.reply(f"错误: {str(e)}")
 
     async def _unload_module(self, event):
@@ -457,6 +2606,13 @@ class Main(BaseModule):
             return
         
         module_name = args[0]
+        keys = [("模块", module_name)]
+        
+        try:
+            self._flights.check(keys, "卸载")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
         
         if not self.sdk.module.is_loaded(module_name):
             await event.reply(f"未加载: 模块 '{module_name}'")
@@ -465,65 +2621,212 @@ class Main(BaseModule):
         await event.reply(f"正在卸载模块 '{module_name}'...")
         
         try:
-            success = await self.sdk.module.unload(module_name)
+            success = await self._flights.run(
+                keys, "卸载", lambda: self.sdk.module.unload(module_name)
+            )
             if success:
+                self._registry.update_module(module_name, loaded=False)
                 await event.reply(f"成功: 模块 '{module_name}' 已卸载")
             else:
                 await event.reply(f"失败: 模块 '{module_name}' 卸载失败")
+        except TargetBusy as e:
+            await event.reply(str(e))
         except Exception as e:
-            self.logger.error(f"卸载模块 {module_name} 时出错: {e}")
+            self._log_error(f"卸载模块 {module_name} 时出错: {e}")
             await event.reply(f"错误: {str(e)}")
 
-    async def _start_adapter(self, event):
-        args = event.get_command_args()
-        if not args:
-            await event.reply("错误: 请指定适配器名称\n用法: /start-adapter <适配器名>")
+    async def _resolve_adapter_targets(self, args, select):
+        """
+        解析适配器批量命令的目标
+        
+        :param args: 命令参数（适配器名列表或 --all）
+        :param select: --all 时用于筛选适配器的函数，接收注册表条目
+        :return: 去重后的适配器名列表
+        """
+        names, options = parse_options(args, flag_options=("--all",))
+        if options.get("--all"):
+            registry = await self._get_registry()
+            names = [name for name, entry in registry.adapters.items() if select(entry)]
+        return list(dict.fromkeys(names))
+
+    async def _run_adapter_batch(self, names, action, operation):
+        """
+        并发执行适配器操作
+        
+        并发数与单个适配器超时取自配置 adapter_concurrency / adapter_timeout。
+        
+        :param names: 适配器名列表
+        :param action: 操作名，同一适配器上的不同操作互斥
+        :param operation: 接收适配器名并返回 (是否成功, 说明) 的协程函数
+        :return: [(适配器名, 是否成功, 说明, 耗时秒数), ...]
+        """
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        concurrency = max(1, int(config.get("adapter_concurrency", 4)))
+        timeout = config.get("adapter_timeout", 30)
+        semaphore = self._get_adapter_slots(concurrency)
+        
+        def finished(flight, name):
+            # 操作真正结束时才释放并发名额，超时后仍在运行的操作继续占用
+            semaphore.release()
+            if not flight.cancelled() and flight.exception() is not None:
+                error = flight.exception()
+                if not isinstance(error, TargetBusy):
+                    self._log_error(f"操作适配器 {name} 时出错: {error}")
+        
+        async def run_one(name):
+            await semaphore.acquire()
+            started = time.perf_counter()
+            flight = asyncio.ensure_future(
+                self._flights.run([("适配器", name)], action, lambda: operation(name))
+            )
+            flight.add_done_callback(lambda f: finished(f, name))
+            try:
+                ok, detail = await asyncio.wait_for(asyncio.shield(flight), timeout)
+            except asyncio.TimeoutError:
+                ok, detail = False, f"超时 ({timeout}s)，操作仍在后台进行"
+            except TargetBusy as e:
+                ok, detail = False, str(e)
+            except Exception as e:
+                ok, detail = False, f"错误: {e}"
+            return name, ok, detail, time.perf_counter() - started
+        
+        return await asyncio.gather(*(run_one(name) for name in names))
+
+    def _get_adapter_slots(self, concurrency):
+        """
+        所有适配器批量操作共享的并发名额
+        
+        adapter_concurrency 变更后新建信号量，已在运行的操作继续在原信号量上释放。
+        """
+        if self._adapter_slots is None or self._adapter_slots[0] != concurrency:
+            self._adapter_slots = (concurrency, asyncio.Semaphore(concurrency))
+        return self._adapter_slots[1]
+
+    async def _adapter_batch_command(self, event, usage, action, select, operation, args=None):
+        """适配器批量命令的公共流程：解析目标、并发执行并回复汇总表"""
+        if args is None:
+            args = event.get_command_args()
+        names = await self._resolve_adapter_targets(args, select)
+        if not names:
+            if "--all" in args:
+                await event.reply(f"没有需要{action}的适配器")
+            else:
+                await event.reply(f"错误: 请指定适配器名称\n用法: {usage}")
             return
         
-        adapter_name = args[0]
+        await event.reply(f"正在{action} {len(names)} 个适配器...")
+        results = await self._run_adapter_batch(names, action, operation)
         
-        if not self.sdk.adapter.exists(adapter_name):
-            await event.reply(f"未找到: 适配器 '{adapter_name}'")
-            return
+        succeeded = sum(1 for _, ok, _, _ in results if ok)
+        lines = []
+        lines.append(f"适配器{action}结果")
+        lines.append("━━━━━")
+        for name, ok, detail, elapsed in results:
+            lines.append(f"{name}: {'成功' if ok else '失败'} {detail} ({elapsed:.2f}s)")
+        lines.append("━━━━━")
+        lines.append(f"成功: {succeeded} 个 / 失败: {len(results) - succeeded} 个")
         
+        await self._send_output(event, "\n".join(lines))
+
+    async def _start_one_adapter(self, adapter_name):
+        if not self.sdk.adapter.exists(adapter_name):
+            return False, "未找到"
         if not self.sdk.adapter.is_enabled(adapter_name):
-            await event.reply(f"已禁用: 适配器 '{adapter_name}'\n请先启用适配器")
-            return
+            return False, "已禁用，请先启用适配器"
         
-        await event.reply(f"正在启动适配器 '{adapter_name}'...")
-        
-        try:
-            await self.sdk.adapter.startup([adapter_name])
-            await event.reply(f"成功: 适配器 '{adapter_name}' 已启动")
-        except Exception as e:
-            self.logger.error(f"启动适配器 {adapter_name} 时出错: {e}")
-            await event.reply(f"错误: {str(e)}")
+        await self.sdk.adapter.startup([adapter_name])
+        self._registry.update_adapter(adapter_name, running=True)
+        self._watchdog_paused.discard(adapter_name)
+        return True, "已启动"
 
-    async def _stop_adapter(self, event):
-        args = event.get_command_args()
-        if not args:
-            await event.reply("错误: 请指定适配器名称\n用法: /stop-adapter <适配器名>")
-            return
+    async def _stop_one_adapter(self, adapter_name):
+        if not self.sdk.adapter.exists(adapter_name):
+            return False, "未找到"
+        
+        # sdk 在适配器关闭后仍返回实例，需单独判断运行状态
+        if not self._probe_adapter(adapter_name):
+            return False, "未运行"
+        
+        adapter_instance = self.sdk.adapter.get(adapter_name)
+        with self._metrics.time_target("adapter", adapter_name, "shutdown"):
+            await adapter_instance.shutdown()
+        self._registry.update_adapter(adapter_name, running=False)
+        # 手动停止的适配器不由看门狗自动恢复
+        self._watchdog_paused.add(adapter_name)
+        return True, "已停止"
+
+    async def _restart_one_adapter(self, adapter_name):
+        if not self.sdk.adapter.exists(adapter_name):
+            return False, "未找到"
         
-        adapter_name = args[0]
+        # 先停止
+        adapter_instance = self.sdk.adapter.get(adapter_name)
+        if adapter_instance and self._probe_adapter(adapter_name):
+            with self._metrics.time_target("adapter", adapter_name, "shutdown"):
+                await adapter_instance.shutdown()
+        
+        # 再启动
+        await self.sdk.adapter.startup([adapter_name])
+        self._registry.update_adapter(adapter_name, running=True)
+        self._watchdog_paused.discard(adapter_name)
+        return True, "已重启"
+
+    async def _wait_adapter_ready(self, adapter_name, timeout):
+        """等待适配器进入运行状态，超时返回 False"""
+        deadline = time.monotonic() + timeout
+        while not self._probe_adapter(adapter_name):
+            if time.monotonic() >= deadline:
+                return False
+            await asyncio.sleep(0.05)
+        return True
+
+    async def _measured_restart_one_adapter(self, adapter_name):
+        """
+        重启适配器并报告中断时间
         
+        sdk 中每个平台只有一个适配器实例，新连接无法在旧连接停止前建立，重启期间该平台必然中断；
+        这里只是在重启后等待适配器进入运行状态，并记录从停止到就绪的实际中断时间。
+        """
         if not self.sdk.adapter.exists(adapter_name):
-            await event.reply(f"未找到: 适配器 '{adapter_name}'")
-            return
+            return False, "未找到"
         
-        await event.reply(f"正在停止适配器 '{adapter_name}'...")
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        ready_timeout = config.get("adapter_ready_timeout", 10)
         
-        try:
-            # 获取适配器实例并调用 shutdown
-            adapter_instance = self.sdk.adapter.get(adapter_name)
-            if adapter_instance:
+        started = time.perf_counter()
+        adapter_instance = self.sdk.adapter.get(adapter_name)
+        if adapter_instance and self._probe_adapter(adapter_name):
+            with self._metrics.time_target("adapter", adapter_name, "shutdown"):
                 await adapter_instance.shutdown()
-                await event.reply(f"成功: 适配器 '{adapter_name}' 已停止")
-            else:
-                await event.reply(f"未运行: 适配器 '{adapter_name}'")
-        except Exception as e:
-            self.logger.error(f"停止适配器 {adapter_name} 时出错: {e}")
-            await event.reply(f"错误: {str(e)}")
+        await self.sdk.adapter.startup([adapter_name])
+        ready = await self._wait_adapter_ready(adapter_name, ready_timeout)
+        downtime = time.perf_counter() - started
+        
+        self._registry.update_adapter(adapter_name, running=ready)
+        if not ready:
+            return False, f"启动后 {ready_timeout}s 内未就绪"
+        
+        self._metrics.observe_target("adapter", adapter_name, "downtime", downtime)
+        self._watchdog_paused.discard(adapter_name)
+        return True, f"已重启，中断 {downtime:.2f}s"
+
+    async def _start_adapter(self, event):
+        await self._adapter_batch_command(
+            event,
+            usage="/start-adapter <适配器名...> | --all",
+            action="启动",
+            select=lambda entry: entry["enabled"] and not entry["running"],
+            operation=self._start_one_adapter,
+        )
+
+    async def _stop_adapter(self, event):
+        await self._adapter_batch_command(
+            event,
+            usage="/stop-adapter <适配器名...> | --all",
+            action="停止",
+            select=lambda entry: entry["running"],
+            operation=self._stop_one_adapter,
+        )
 
     async def _enable_adapter(self, event):
         args = event.get_command_args()
@@ -533,6 +2836,12 @@ class Main(BaseModule):
         
         adapter_name = args[0]
         
+        try:
+            self._flights.check([("适配器", adapter_name)], "启用")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
+        
         if not self.sdk.adapter.exists(adapter_name):
             await event.reply(f"未找到: 适配器 '{adapter_name}'")
             return
@@ -543,6 +2852,7 @@ class Main(BaseModule):
         
         success = self.sdk.adapter.enable(adapter_name)
         if success:
+            self._registry.update_adapter(adapter_name, enabled=True)
             await event.reply(f"成功: 适配器 '{adapter_name}' 已启用\n使用 /start-adapter 启动它")
         else:
             await event.reply(f"失败: 启用适配器 '{adapter_name}' 失败")
@@ -555,6 +2865,12 @@ class Main(BaseModule):
         
         adapter_name = args[0]
         
+        try:
+            self._flights.check([("适配器", adapter_name)], "禁用")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
+        
         if not self.sdk.adapter.exists(adapter_name):
             await event.reply(f"未找到: 适配器 '{adapter_name}'")
             return
@@ -565,104 +2881,173 @@ class Main(BaseModule):
         
         success = self.sdk.adapter.disable(adapter_name)
         if success:
+            self._registry.update_adapter(adapter_name, enabled=False)
             await event.reply(f"成功: 适配器 '{adapter_name}' 已禁用")
         else:
             await event.reply(f"失败: 禁用适配器 '{adapter_name}' 失败")
 
     # ========== 配置管理命令实现 ==========
 
+    def _render_config(self, path):
+        """读取并渲染配置路径处的值，仅读取路径所在的子树"""
+        config_key, rest = parse_config_path(path)
+        # 点分部分交给 config 读取，列表下标部分在本地解析
+        return format_value(resolve_path(self.sdk.config.getConfig(config_key), rest))
+
     async def _get_config(self, event):
         """获取模块/适配器配置"""
         args = event.get_command_args()
         if not args:
-            await event.reply("错误: 请指定配置键\n用法: /get-config <配置键>")
+            await event.reply("错误: 请指定配置路径\n用法: /get-config <配置路径>")
             return
         
-        config_key = args[0]
-        value = self.sdk.config.getConfig(config_key)
+        path = args[0]
+        try:
+            text = self._render_config(path)
+        except ValueError as e:
+            await event.reply(f"错误: {str(e)}")
+            return
         
         lines = []
-        lines.append(f"配置项: {config_key}")
+        lines.append(f"配置项: {path}")
         lines.append("━━━━━")
-        if value is None:
-            lines.append("值: (未设置)")
-        elif isinstance(value, (dict, list)):
-            import json
-            lines.append(f"值:\n{json.dumps(value, indent=2, ensure_ascii=False)}")
-        else:
-            lines.append(f"值: {value}")
+        lines.append(text)
         
-        await event.reply("\n".join(lines))
+        await self._send_output(event, "\n".join(lines))
+
+    async def _write_config_path(self, path, func):
+        """
+        以 func(当前值) 的返回值替换配置路径处的值，仅读写路径所在的子树
+        
+        :raises ValueError: 路径格式无效
+        :raises KeyError: 列表下标越界或路径穿过非容器值
+        """
+        config_key, rest = parse_config_path(path)
+        
+        def apply(current):
+            return update_path(current, rest, func), None
+        
+        await self._config_writer.update(config_key, apply)
 
     async def _set_config(self, event):
         """设置模块/适配器配置"""
         args = event.get_command_args()
         if len(args) < 2:
-            await event.reply("错误: 请指定配置键和值\n用法: /set-config <配置键> <值>")
+            await event.reply("错误: 请指定配置路径和值\n用法: /set-config <配置路径> <值>")
             return
         
-        config_key = args[0]
+        path = args[0]
         value_str = " ".join(args[1:])
         
-        # 尝试解析值（支持 JSON）
-        import json
-        try:
-            if value_str.startswith("{") or value_str.startswith("["):
-                value = json.loads(value_str)
-            else:
-                value = value_str
-        except json.JSONDecodeError:
-            value = value_str
+        value = parse_value(value_str)
         
-        success = self.sdk.config.setConfig(config_key, value)
-        if success:
-            await event.reply(f"成功: 配置 '{config_key}' 已设置")
-        else:
-            await event.reply(f"失败: 设置配置 '{config_key}' 失败")
+        try:
+            await self._write_config_path(path, lambda current: value)
+        except ValueError as e:
+            await event.reply(f"错误: {str(e)}")
+            return
+        except KeyError as e:
+            await event.reply(f"错误: 配置路径 '{path}' 不存在: {e.args[0]}")
+            return
+        except Exception as e:
+            self._log_error(f"设置配置 {path} 时出错: {e}")
+            await event.reply(f"失败: 设置配置 '{path}' 失败")
+            return
+        await event.reply(f"成功: 配置 '{path}' 已设置")
 
-    async def _add_admin(self, event):
-        """添加管理员"""
+    async def _patch_config(self, event):
+        """以 JSON Merge Patch 局部更新配置"""
         args = event.get_command_args()
-        if not args:
-            await event.reply("错误: 请指定用户ID或群组ID\n用法: /add-admin <用户ID/群组ID>")
+        if len(args) < 2:
+            await event.reply("错误: 请指定配置路径和补丁\n用法: /patch-config <配置路径> <JSON>")
             return
         
-        admin_id = args[0]
-        admins = self._get_admins()
-        
-        if admin_id in admins:
-            await event.reply(f"已存在: '{admin_id}' 已是管理员")
+        path = args[0]
+        import json
+        try:
+            patch = json.loads(" ".join(args[1:]))
+        except json.JSONDecodeError as e:
+            await event.reply(f"错误: 补丁不是有效的 JSON\n{str(e)}")
             return
         
-        admins.append(admin_id)
+        try:
+            await self._write_config_path(path, lambda current: merge_patch(current, patch))
+        except ValueError as e:
+            await event.reply(f"错误: {str(e)}")
+            return
+        except KeyError as e:
+            await event.reply(f"错误: 配置路径 '{path}' 不存在: {e.args[0]}")
+            return
+        except Exception as e:
+            self._log_error(f"更新配置 {path} 时出错: {e}")
+            await event.reply(f"失败: 更新配置 '{path}' 失败")
+            return
+        await event.reply(f"成功: 配置 '{path}' 已更新")
+
+    async def _update_admins(self, admin_ids, add):
+        """
+        在最新的管理员列表上添加或移除管理员
+        
+        :return: (实际变更的 ID 列表, 未变更的 ID 列表)
+        """
+        def apply(config):
+            config = config or {}
+            admins = config.get("admins", [])
+            existing = {str(a) for a in admins}
+            if add:
+                changed = [admin_id for admin_id in admin_ids if admin_id not in existing]
+                admins = admins + changed
+            else:
+                changed = [admin_id for admin_id in admin_ids if admin_id in existing]
+                removed = set(changed)
+                admins = [a for a in admins if str(a) not in removed]
+            unchanged = [admin_id for admin_id in admin_ids if admin_id not in changed]
+            config["admins"] = admins
+            return config, (changed, unchanged)
+        
+        return await self._config_writer.update("AdminControl", apply)
+
+    async def _add_admin(self, event):
+        """添加一个或多个管理员"""
+        admin_ids = list(dict.fromkeys(event.get_command_args()))
+        if not admin_ids:
+            await event.reply("错误: 请指定用户ID或群组ID\n用法: /add-admin <用户ID/群组ID...>")
+            return
         
-        config = self.sdk.config.getConfig("AdminControl", {})
-        config["admins"] = admins
-        self.sdk.config.setConfig("AdminControl", config)
+        try:
+            added, existing = await self._update_admins(admin_ids, add=True)
+        except Exception as e:
+            self._log_error(f"添加管理员时出错: {e}")
+            await event.reply(f"错误: 添加管理员失败\n{str(e)}")
+            return
         
-        await event.reply(f"成功: '{admin_id}' 已添加为管理员")
+        lines = []
+        if added:
+            lines.append(f"成功: {', '.join(repr(a) for a in added)} 已添加为管理员")
+        if existing:
+            lines.append(f"已存在: {', '.join(repr(a) for a in existing)} 已是管理员")
+        await event.reply("\n".join(lines))
 
     async def _remove_admin(self, event):
-        """移除管理员"""
-        args = event.get_command_args()
-        if not args:
-            await event.reply("错误: 请指定用户ID或群组ID\n用法: /remove-admin <用户ID/群组ID>")
+        """移除一个或多个管理员"""
+        admin_ids = list(dict.fromkeys(event.get_command_args()))
+        if not admin_ids:
+            await event.reply("错误: 请指定用户ID或群组ID\n用法: /remove-admin <用户ID/群组ID...>")
             return
         
-        admin_id = args[0]
-        admins = self._get_admins()
-        
-        if admin_id not in admins:
-            await event.reply(f"未找到: '{admin_id}' 不是管理员")
+        try:
+            removed, missing = await self._update_admins(admin_ids, add=False)
+        except Exception as e:
+            self._log_error(f"移除管理员时出错: {e}")
+            await event.reply(f"错误: 移除管理员失败\n{str(e)}")
             return
         
-        admins.remove(admin_id)
-        
-        config = self.sdk.config.getConfig("AdminControl", {})
-        config["admins"] = admins
-        self.sdk.config.setConfig("AdminControl", config)
-        
-        await event.reply(f"成功: '{admin_id}' 已从管理员列表中移除")
+        lines = []
+        if removed:
+            lines.append(f"成功: {', '.join(repr(a) for a in removed)} 已从管理员列表中移除")
+        if missing:
+            lines.append(f"未找到: {', '.join(repr(a) for a in missing)} 不是管理员")
+        await event.reply("\n".join(lines))
 
     async def _list_admins(self, event):
         """列出所有管理员"""
@@ -679,7 +3064,24 @@ class Main(BaseModule):
         lines.append("━━━━━")
         lines.append(f"总计: {len(admins)} 个管理员")
         
-        await event.reply("\n".join(lines))
+        # 角色规则会暴露各角色的用户ID/群组ID，仅向 owner 展示
+        roles = (self.sdk.config.getConfig("AdminControl") or {}).get("roles") or []
+        if roles and self.has_role(event, "owner", "admin"):
+            lines.append("")
+            lines.append("角色规则")
+            lines.append("━━━━━")
+            for rule in roles:
+                if not isinstance(rule, dict):
+                    continue
+                ids = rule.get("ids", [])
+                ids = ", ".join(str(i) for i in ids) if isinstance(ids, list) else str(ids)
+                scopes = rule.get("command_groups") or "全部命令组"
+                if isinstance(scopes, list):
+                    scopes = ", ".join(scopes)
+                where = f"（仅群组 {rule['group_id']}）" if rule.get("group_id") else ""
+                lines.append(f"  {rule.get('role')}: {ids} - {scopes}{where}")
+        
+        await self._send_output(event, "\n".join(lines))
 
     # ========== 存储管理命令实现 ==========
 
@@ -696,74 +3098,623 @@ class Main(BaseModule):
         lines = []
         lines.append(f"存储键: {key}")
         lines.append("━━━━━")
-        if value is None:
-            lines.append("值: (未设置)")
-        elif isinstance(value, (dict, list)):
-            import json
-            lines.append(f"值:\n{json.dumps(value, indent=2, ensure_ascii=False)}")
-        else:
-            lines.append(f"值: {value}")
+        lines.append(format_value(value))
+        remaining = self._get_expiry_index().remaining(key, time.time())
+        if remaining is not None and value is not None:
+            lines.append(f"剩余有效期: {max(0, remaining):.0f}s")
         
-        await event.reply("\n".join(lines))
+        await self._send_output(event, "\n".join(lines))
 
     async def _set_storage(self, event):
-        """设置存储值"""
-        args = event.get_command_args()
+        """设置存储值，--ttl 指定有效期（秒）"""
+        usage = "用法: /set-storage <键名> <值> [--ttl 秒数]"
+        try:
+            args, options = parse_options(event.get_command_args(), value_options=("--ttl",))
+            ttl = float(options["--ttl"]) if "--ttl" in options else None
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
         if len(args) < 2:
-            await event.reply("错误: 请指定键名和值\n用法: /set-storage <键名> <值>")
+            await event.reply(f"错误: 请指定键名和值\n{usage}")
+            return
+        if ttl is not None and ttl <= 0:
+            await event.reply(f"错误: 有效期必须为正数\n{usage}")
             return
         
         key = args[0]
         value_str = " ".join(args[1:])
         
-        # 尝试解析值（支持 JSON）
+        value = parse_value(value_str)
+        
+        if ttl is None:
+            success = self.sdk.storage.set(key, value)
+            if success:
+                self._discard_expiry([key])
+        else:
+            success = self.set_with_ttl(key, value, ttl)
+        if success:
+            suffix = f"，{ttl:g} 秒后过期" if ttl is not None else ""
+            await event.reply(f"成功: 存储键 '{key}' 已设置{suffix}")
+        else:
+            await event.reply(f"失败: 设置存储键 '{key}' 失败")
+
+    async def _mset_storage(self, event):
+        """按批写入 JSON 对象中的所有键值"""
+        usage = "用法: /mset-storage <JSON 对象>"
         import json
         try:
-            if value_str.startswith("{") or value_str.startswith("["):
-                value = json.loads(value_str)
+            items = json.loads(" ".join(event.get_command_args()))
+        except json.JSONDecodeError as e:
+            await event.reply(f"错误: 无效的 JSON\n{str(e)}\n{usage}")
+            return
+        
+        if not isinstance(items, dict) or not items:
+            await event.reply(f"错误: 请提供非空的 JSON 对象\n{usage}")
+            return
+        
+        written = failed = 0
+        started = time.perf_counter()
+        pairs = list(items.items())
+        for i in range(0, len(pairs), self.STORAGE_BATCH_SIZE):
+            batch = dict(pairs[i:i + self.STORAGE_BATCH_SIZE])
+            if self._set_storage_values(batch):
+                written += len(batch)
             else:
-                value = value_str
-        except json.JSONDecodeError:
-            value = value_str
+                failed += len(batch)
+            await asyncio.sleep(0)
         
+        elapsed = time.perf_counter() - started
+        lines = []
+        lines.append(f"成功: 已设置 {written} 个存储键")
+        if failed:
+            lines.append(f"失败: {failed} 个键写入失败")
+        lines.append(f"耗时 {elapsed:.3f}s ({written / elapsed if elapsed else 0:.0f} 键/秒)")
+        await event.reply("\n".join(lines))
+
+    def _delete_keys(self, keys):
+        """批量删除存储键，存储后端不支持批量删除时逐个删除"""
+        delete_multi = getattr(self.sdk.storage, "delete_multi", None)
+        if delete_multi is not None:
+            return delete_multi(keys)
+        return all([self.sdk.storage.delete(key) for key in keys])
+
+    def _delete_storage_values(self, keys):
+        """批量删除存储键及其有效期"""
+        success = self._delete_keys(keys)
+        self._discard_expiry(keys)
+        return success
+
+    # ========== 存储有效期 ==========
+
+    def _get_expiry_index(self):
+        """获取存储键过期索引，首次调用时从存储中的过期时间条目加载"""
+        if self._expiry is None:
+            prefix = self.TTL_KEY_PREFIX
+            entries = [key for key in self.sdk.storage.get_all_keys() if key.startswith(prefix)]
+            deadlines = self._get_storage_values(entries) if entries else {}
+            self._expiry = ExpiryIndex({key[len(prefix):]: deadline for key, deadline in deadlines.items()})
+        return self._expiry
+
+    def _set_expiry(self, key, deadline):
+        """记录键的过期时间，并立即写入该键自己的过期时间条目，进程异常退出后仍然生效"""
+        self._get_expiry_index().set(key, deadline)
+        self.sdk.storage.set(self.TTL_KEY_PREFIX + key, deadline)
+
+    def _discard_expiry(self, keys):
+        index = self._get_expiry_index()
+        if index.deadlines:
+            removed = [self.TTL_KEY_PREFIX + key for key in keys if index.discard(key)]
+            if removed:
+                self._delete_keys(removed)
+
+    def set_with_ttl(self, key, value, ttl):
+        """
+        设置存储值并在 ttl 秒后自动删除（供其他模块调用）
+        
+        :param key: 存储键名
+        :param value: 存储值
+        :param ttl: 有效期（秒）
+        :return: 是否设置成功
+        :raises ValueError: ttl 不为正数时
+        """
+        if ttl <= 0:
+            raise ValueError("有效期必须为正数")
         success = self.sdk.storage.set(key, value)
         if success:
-            await event.reply(f"成功: 存储键 '{key}' 已设置")
-        else:
-            await event.reply(f"失败: 设置存储键 '{key}' 失败")
+            self._set_expiry(key, time.time() + ttl)
+        return success
+
+    def expire(self, key, ttl):
+        """
+        为已存在的存储键设置有效期（供其他模块调用）
+        
+        :return: 键存在并设置成功时为 True
+        :raises ValueError: ttl 不为正数时
+        """
+        if ttl <= 0:
+            raise ValueError("有效期必须为正数")
+        if self.sdk.storage.get(key) is None:
+            return False
+        self._set_expiry(key, time.time() + ttl)
+        return True
+
+    def get_ttl(self, key):
+        """返回存储键的剩余有效期（秒），未设置有效期时返回 None（供其他模块调用）"""
+        remaining = self._get_expiry_index().remaining(key, time.time())
+        return None if remaining is None else max(0.0, remaining)
+
+    def persist(self, key):
+        """移除存储键的有效期，返回键原本是否设置了有效期（供其他模块调用）"""
+        if self._get_expiry_index().remaining(key, 0) is None:
+            return False
+        self._discard_expiry([key])
+        return True
+
+    async def _sweeper_loop(self):
+        """后台清理任务：定期分批删除已过期的存储键"""
+        while True:
+            config = self.sdk.config.getConfig("AdminControl") or {}
+            await asyncio.sleep(config.get("ttl_sweep_interval", 60))
+            try:
+                await self._sweep_expired(max(1, int(config.get("ttl_sweep_batch", 1000))))
+            except Exception as e:
+                self._log_error(f"清理过期存储键时出错: {e}")
+
+    async def _sweep_expired(self, batch_size):
+        """
+        删除所有已过期的存储键
+        
+        :param batch_size: 每批删除的键数，批次之间让出事件循环
+        :return: 删除的键数
+        """
+        index = self._get_expiry_index()
+        removed = 0
+        while True:
+            keys = index.pop_expired(time.time(), batch_size)
+            if not keys:
+                break
+            # 同时删除这些键的过期时间条目
+            self._delete_keys(keys + [self.TTL_KEY_PREFIX + key for key in keys])
+            removed += len(keys)
+            await asyncio.sleep(0)
+        if removed:
+            self.logger.debug(f"已清理 {removed} 个过期存储键")
+        return removed
+
+    async def _delete_storage_matching(self, event, pattern, token):
+        """
+        按前缀/通配符批量删除存储键
+        
+        未携带确认码时只统计匹配数量并生成确认码；确认码与模式一致且未过期时才执行删除。
+        """
+        session = self._session_key(event)
+        now = time.monotonic()
+        
+        if token is None:
+            count = 0
+            sample = []
+            for count, key in enumerate(self._iter_storage_keys(pattern), 1):
+                if len(sample) < 5:
+                    sample.append(key)
+                if count % self.STORAGE_SCAN_YIELD_EVERY == 0:
+                    await asyncio.sleep(0)
+            if not count:
+                await event.reply(f"未找到: 没有匹配 '{pattern}' 的存储键")
+                return
+            
+            token = f"{random.randrange(16 ** 6):06x}"
+            self._pending_deletes[session] = (pattern, token, now + self.STORAGE_DELETE_CONFIRM_TTL)
+            lines = []
+            lines.append(f"将删除 {count} 个匹配 '{pattern}' 的存储键，例如:")
+            lines.extend(f"  {key}" for key in sample)
+            lines.append(f"确认删除请在 {self.STORAGE_DELETE_CONFIRM_TTL} 秒内发送:")
+            lines.append(f"/delete-storage --match {pattern} --confirm {token}")
+            await self._send_output(event, "\n".join(lines))
+            return
+        
+        pending = self._pending_deletes.get(session)
+        if pending is None or pending[:2] != (pattern, token) or pending[2] < now:
+            await event.reply("错误: 确认码无效或已过期，请重新发送不带 --confirm 的命令预览")
+            return
+        del self._pending_deletes[session]
+        
+        report = self._progress_reporter(event, "删除")
+        deleted = failed = 0
+        started = time.perf_counter()
+        # 先收集键名再删除，避免在遍历过程中修改存储
+        keys = list(self._iter_storage_keys(pattern))
+        for i in range(0, len(keys), self.STORAGE_BATCH_SIZE):
+            batch = keys[i:i + self.STORAGE_BATCH_SIZE]
+            if self._delete_storage_values(batch):
+                deleted += len(batch)
+            else:
+                failed += len(batch)
+            await report(deleted)
+            await asyncio.sleep(0)
+        
+        elapsed = time.perf_counter() - started
+        lines = []
+        lines.append(f"成功: 已删除 {deleted} 个匹配 '{pattern}' 的存储键")
+        if failed:
+            lines.append(f"失败: {failed} 个键删除失败")
+        lines.append(f"耗时 {elapsed:.3f}s ({deleted / elapsed if elapsed else 0:.0f} 键/秒)")
+        await event.reply("\n".join(lines))
 
     async def _delete_storage(self, event):
-        """删除存储值"""
-        args = event.get_command_args()
+        """删除存储值，--match 时按模式批量删除"""
+        usage = "用法: /delete-storage <键名> | --match <前缀|通配符> [--confirm <确认码>]"
+        try:
+            args, options = parse_options(
+                event.get_command_args(), value_options=("--match", "--confirm")
+            )
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        if "--match" in options:
+            await self._delete_storage_matching(event, options["--match"], options.get("--confirm"))
+            return
+        
         if not args:
-            await event.reply("错误: 请指定键名\n用法: /delete-storage <键名>")
+            await event.reply(f"错误: 请指定键名\n{usage}")
             return
         
         key = args[0]
         success = self.sdk.storage.delete(key)
         if success:
+            self._discard_expiry([key])
             await event.reply(f"成功: 存储键 '{key}' 已删除")
         else:
             await event.reply(f"失败: 删除存储键 '{key}' 失败")
 
+    def _iter_storage_keys(self, pattern=None):
+        """按前缀/通配符惰性遍历存储键名，跳过本模块内部的过期时间条目"""
+        for _, key in self._scan_storage_keys(self.sdk.storage.get_all_keys(), pattern):
+            yield key
+
+    def _scan_storage_keys(self, keys, pattern=None, start=0):
+        """从 keys 的 start 位置起按前缀/通配符遍历，产出 (位置, 键名)"""
+        matcher = compile_key_matcher(pattern)
+        internal = self.TTL_KEY_PREFIX
+        for position in range(start, len(keys)):
+            key = keys[position]
+            if key.startswith(internal):
+                continue
+            if matcher is None or matcher(key):
+                yield position, key
+
+    def _get_storage_values(self, keys):
+        """批量读取存储值，存储后端不支持批量读取时逐个读取"""
+        get_multi = getattr(self.sdk.storage, "get_multi", None)
+        if get_multi is not None:
+            return get_multi(keys)
+        return {key: self.sdk.storage.get(key) for key in keys}
+
+    def _set_storage_values(self, items):
+        """批量写入存储值，存储后端不支持批量写入时逐个写入；写入会清除键的有效期"""
+        set_multi = getattr(self.sdk.storage, "set_multi", None)
+        if set_multi is not None:
+            success = set_multi(items)
+        else:
+            success = all([self.sdk.storage.set(key, value) for key, value in items.items()])
+        if success:
+            self._discard_expiry(items)
+        return success
+
+    def _progress_reporter(self, event, action):
+        """
+        返回长耗时存储操作的进度回调
+        
+        回调接收已处理条数，距上次回复超过 storage_progress_interval 秒时回复一次进度。
+        """
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        interval = config.get("storage_progress_interval", 10)
+        started = time.perf_counter()
+        last = [started]
+        
+        async def report(done):
+            now = time.perf_counter()
+            if now - last[0] < interval:
+                return
+            last[0] = now
+            await event.reply(f"{action}中: 已处理 {done} 条 ({done / (now - started):.0f} 条/秒)")
+        
+        return report
+
+    async def _storage_usage(self, event):
+        """按命名空间统计存储占用，在后台任务中执行"""
+        args = event.get_command_args()
+        pattern = args[0] if args else None
+        session = self._session_key(event)
+        
+        running = self._usage_tasks.get(session)
+        if running is not None and not running.done():
+            await event.reply("忙碌: 当前会话已有正在进行的存储占用统计，请稍后再试")
+            return
+        
+        await event.reply(f"正在后台统计存储占用{f'（匹配: {pattern}）' if pattern else ''}...")
+        task = asyncio.ensure_future(self._run_storage_usage(event, pattern))
+        self._usage_tasks[session] = task
+        
+        def release(finished):
+            if self._usage_tasks.get(session) is finished:
+                del self._usage_tasks[session]
+        
+        task.add_done_callback(release)
+
+    async def _run_storage_usage(self, event, pattern):
+        config = self.sdk.config.getConfig("AdminControl") or {}
+        sample_size = max(1, int(config.get("storage_usage_sample", 1000)))
+        report = self._progress_reporter(event, "统计")
+        started = time.perf_counter()
+        
+        try:
+            # 第一遍只遍历键名：精确计数并为每个命名空间抽样
+            usage = {}
+            scanned = 0
+            for scanned, key in enumerate(self._iter_storage_keys(pattern), 1):
+                namespace, sep, _ = key.partition(":")
+                namespace = namespace if sep else "(无命名空间)"
+                entry = usage.get(namespace)
+                if entry is None:
+                    entry = usage[namespace] = NamespaceUsage(sample_size)
+                entry.offer(key)
+                if scanned % self.STORAGE_SCAN_YIELD_EVERY == 0:
+                    await report(scanned)
+                    await asyncio.sleep(0)
+            
+            # 第二遍按批读取样本值并计算序列化大小，计算放到线程中执行
+            def measure_batch(entry, values):
+                for key, value in values.items():
+                    entry.measure(key, value)
+            
+            for entry in usage.values():
+                for i in range(0, len(entry.sample), self.STORAGE_BATCH_SIZE):
+                    values = self._get_storage_values(entry.sample[i:i + self.STORAGE_BATCH_SIZE])
+                    await asyncio.to_thread(measure_batch, entry, values)
+        except Exception as e:
+            self._log_error(f"统计存储占用时出错: {e}")
+            await event.reply(f"错误: 统计存储占用失败\n{str(e)}")
+            return
+        
+        elapsed = time.perf_counter() - started
+        total_bytes = sum(entry.estimated_bytes for entry in usage.values())
+        lines = []
+        lines.append("存储占用统计")
+        if pattern:
+            lines.append(f"匹配: {pattern}")
+        lines.append("━━━━━")
+        for namespace, entry in sorted(usage.items(), key=lambda item: -item[1].estimated_bytes):
+            approx = "" if entry.exact else "约 "
+            largest_size, largest_key = entry.largest
+            types = sorted(entry.types.items(), key=lambda item: -item[1])
+            sampled = sum(entry.types.values()) or 1
+            lines.append(f"{namespace}: {entry.count} 键，{approx}{format_size(entry.estimated_bytes)}")
+            if largest_key is not None:
+                scope = "最大" if entry.exact else "样本中最大"
+                lines.append(f"  {scope}: {largest_key} ({format_size(largest_size)})")
+            lines.append("  类型: " + "，".join(
+                f"{name} {count * 100 / sampled:.0f}%" for name, count in types
+            ))
+        if not usage:
+            lines.append("  (无)")
+        lines.append("━━━━━")
+        lines.append(
+            f"共 {scanned} 键，{len(usage)} 个命名空间，约 {format_size(total_bytes)}"
+            f"（每个命名空间至多抽样 {sample_size} 个值，耗时 {elapsed:.2f}s）"
+        )
+        await self._send_output(event, "\n".join(lines))
+
+    async def _export_storage(self, event):
+        """按批读取存储并以 JSONL 流式写入文件"""
+        usage = "用法: /export-storage [前缀|通配符] <文件路径> [--gzip]"
+        try:
+            args, options = parse_options(event.get_command_args(), flag_options=("--gzip",))
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        if len(args) not in (1, 2):
+            await event.reply(f"错误: 请指定导出文件路径\n{usage}")
+            return
+        pattern, path = (None, args[0]) if len(args) == 1 else args
+        compress = options.get("--gzip", False) or path.endswith(".gz")
+        
+        report = self._progress_reporter(event, "导出")
+        written = skipped = 0
+        started = time.perf_counter()
+        try:
+            f = await asyncio.to_thread(open_jsonl, path, "w", compress)
+        except OSError as e:
+            self._log_error(f"导出存储时出错: {e}")
+            await event.reply(f"错误: 导出失败\n{str(e)}")
+            return
+        
+        try:
+            batch = []
+            keys = self._iter_storage_keys(pattern)
+            while True:
+                batch.clear()
+                for key in keys:
+                    batch.append(key)
+                    if len(batch) >= self.STORAGE_BATCH_SIZE:
+                        break
+                if not batch:
+                    break
+                
+                # 存储读取留在事件循环中，序列化与文件写入放到线程中执行
+                values = self._get_storage_values(batch)
+                items = [(key, values[key]) for key in batch if key in values]
+                count, failed = await asyncio.to_thread(write_jsonl_batch, f, items)
+                written += count
+                skipped += failed
+                await report(written)
+        except OSError as e:
+            self._log_error(f"导出存储时出错: {e}")
+            await event.reply(f"错误: 导出失败（已写入 {written} 条）\n{str(e)}")
+            return
+        finally:
+            await asyncio.to_thread(f.close)
+        
+        elapsed = time.perf_counter() - started
+        lines = []
+        lines.append(f"成功: 已导出 {written} 条到 {path}")
+        if skipped:
+            lines.append(f"跳过 {skipped} 条无法序列化为 JSON 的值")
+        lines.append(f"耗时 {elapsed:.2f}s ({written / elapsed if elapsed else 0:.0f} 条/秒)")
+        await event.reply("\n".join(lines))
+
+    async def _import_storage(self, event):
+        """从 JSONL 文件按批导入存储，--dry-run 时仅校验并统计"""
+        usage = "用法: /import-storage <文件路径> [--dry-run]"
+        try:
+            args, options = parse_options(event.get_command_args(), flag_options=("--dry-run",))
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        if len(args) != 1:
+            await event.reply(f"错误: 请指定导入文件路径\n{usage}")
+            return
+        path = args[0]
+        dry_run = options.get("--dry-run", False)
+        
+        report = self._progress_reporter(event, "校验" if dry_run else "导入")
+        imported = overwritten = invalid = failed = 0
+        started = time.perf_counter()
+        try:
+            f = await asyncio.to_thread(open_jsonl, path, "r")
+        except OSError as e:
+            await event.reply(f"错误: 无法打开文件\n{str(e)}")
+            return
+        
+        try:
+            eof = False
+            while not eof:
+                records, bad, eof = await asyncio.to_thread(read_jsonl_batch, f, self.STORAGE_BATCH_SIZE)
+                invalid += bad
+                if not records:
+                    continue
+                
+                items = dict(records)
+                if dry_run:
+                    overwritten += len(self._get_storage_values(list(items)))
+                elif not self._set_storage_values(items):
+                    failed += len(items)
+                    continue
+                imported += len(items)
+                await report(imported)
+        except (OSError, EOFError, UnicodeDecodeError) as e:
+            self._log_error(f"导入存储时出错: {e}")
+            await event.reply(f"错误: 读取文件失败（已处理 {imported} 条）\n{str(e)}")
+            return
+        finally:
+            await asyncio.to_thread(f.close)
+        
+        elapsed = time.perf_counter() - started
+        lines = []
+        if dry_run:
+            lines.append(f"校验完成: {path} 中有 {imported} 条有效记录（试运行，未写入）")
+            lines.append(f"其中 {overwritten} 个键已存在，导入时将被覆盖")
+        else:
+            lines.append(f"成功: 已从 {path} 导入 {imported} 条")
+        if invalid:
+            lines.append(f"跳过 {invalid} 行无效记录")
+        if failed:
+            lines.append(f"失败: {failed} 条写入失败")
+        lines.append(f"耗时 {elapsed:.2f}s ({imported / elapsed if elapsed else 0:.0f} 条/秒)")
+        await event.reply("\n".join(lines))
+
     async def _list_storage(self, event):
-        """列出所有存储键名"""
+        """分页列出存储键名"""
+        usage = "用法: /list-storage [前缀|通配符] [--cursor 令牌 | --page N] [--limit K]"
+        try:
+            args, options = parse_options(
+                event.get_command_args(), value_options=("--cursor", "--page", "--limit")
+            )
+            page = int(options.get("--page", 1))
+            limit = int(options.get("--limit", self.STORAGE_PAGE_SIZE))
+            cursor = decode_cursor(options["--cursor"]) if "--cursor" in options else None
+        except ValueError as e:
+            await event.reply(f"错误: {e}\n{usage}")
+            return
+        
+        if page < 1 or limit < 1:
+            await event.reply(f"错误: 页码和每页数量必须为正整数\n{usage}")
+            return
+        limit = min(limit, self.STORAGE_PAGE_SIZE_MAX)
+        pattern = args[0] if args else None
+        
         keys = self.sdk.storage.get_all_keys()
+        start = 0
+        shifted = False
+        if cursor is not None:
+            # 从上一页最后一个键之后继续扫描；键空间变化导致位置偏移时按键名重新定位
+            position, last_key = cursor
+            if 0 < position <= len(keys) and keys[position - 1] == last_key:
+                start = position
+            else:
+                try:
+                    start = keys.index(last_key) + 1
+                except ValueError:
+                    # 最后一个键已被删除：其后的键前移一位
+                    start = max(0, min(position - 1, len(keys)))
+                    shifted = True
+        
+        # 跳过前面的页面（仅 --page），只收集当前页和用于判断是否有下一页的一个键
+        page_keys = []
+        has_more = False
+        next_position = start
+        skip = (page - 1) * limit if cursor is None else 0
+        for scanned, (position, key) in enumerate(self._scan_storage_keys(keys, pattern, start), 1):
+            if skip:
+                skip -= 1
+            elif len(page_keys) < limit:
+                page_keys.append(key)
+                next_position = position + 1
+            else:
+                has_more = True
+                break
+            # 大键空间下定期让出事件循环
+            if scanned % self.STORAGE_SCAN_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+        
+        # 仅为当前页批量读取值类型
+        values = self._get_storage_values(page_keys) if page_keys else {}
+        index = self._get_expiry_index()
+        now = time.time()
         
         lines = []
         lines.append("存储键名列表")
+        if pattern:
+            lines.append(f"匹配: {pattern}")
         lines.append("━━━━━")
-        if keys:
-            for key in keys:
-                value = self.sdk.storage.get(key)
-                value_type = type(value).__name__
-                lines.append(f"  {key} ({value_type})")
+        if page_keys:
+            for key in page_keys:
+                value_type = type(values.get(key)).__name__
+                remaining = index.remaining(key, now)
+                if remaining is None:
+                    lines.append(f"  {key} ({value_type})")
+                elif remaining > 0:
+                    lines.append(f"  {key} ({value_type}，剩余 {remaining:.0f}s)")
+                else:
+                    lines.append(f"  {key} ({value_type}，已过期)")
         else:
             lines.append("  (无)")
         lines.append("━━━━━")
-        lines.append(f"总计: {len(keys)} 个存储项")
-        
-        await event.reply("\n".join(lines))
+        if cursor is None:
+            lines.append(f"第 {page} 页，本页 {len(page_keys)} 项")
+        else:
+            lines.append(f"本页 {len(page_keys)} 项")
+        if shifted:
+            lines.append("上一页的最后一个键已被删除，可能有少量键被跳过或重复")
+        if has_more:
+            next_args = f"{pattern} " if pattern else ""
+            token = encode_cursor(next_position, page_keys[-1])
+            lines.append(f"下一页: /list-storage {next_args}--cursor {token} --limit {limit}")
+        
+        await self._send_output(event, "\n".join(lines))
 
     # ========== 模块管理命令实现 ==========
 
@@ -776,6 +3727,12 @@ class Main(BaseModule):
         
         module_name = args[0]
         
+        try:
+            self._flights.check([("模块", module_name)], "启用")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
+        
         if not self.sdk.module.exists(module_name):
             await event.reply(f"未找到: 模块 '{module_name}'")
             return
@@ -786,6 +3743,7 @@ class Main(BaseModule):
         
         success = self.sdk.module.enable(module_name)
         if success:
+            self._registry.update_module(module_name, enabled=True)
             await event.reply(f"成功: 模块 '{module_name}' 已启用")
         else:
             await event.reply(f"失败: 启用模块 '{module_name}' 失败")
@@ -799,6 +3757,12 @@ class Main(BaseModule):
         
         module_name = args[0]
         
+        try:
+            self._flights.check([("模块", module_name)], "禁用")
+        except TargetBusy as e:
+            await event.reply(str(e))
+            return
+        
         if not self.sdk.module.exists(module_name):
             await event.reply(f"未找到: 模块 '{module_name}'")
             return
@@ -809,6 +3773,7 @@ class Main(BaseModule):
         
         success = self.sdk.module.disable(module_name)
         if success:
+            self._registry.update_module(module_name, enabled=False)
             await event.reply(f"成功: 模块 '{module_name}' 已禁用")
         else:
             await event.reply(f"失败: 禁用模块 '{module_name}' 失败")
@@ -816,39 +3781,109 @@ class Main(BaseModule):
     # ========== 适配器管理命令实现 ==========
 
     async def _restart_adapter(self, event):
-        """重启指定适配器"""
+        """重启指定适配器，--measure 时等待就绪并报告中断时间"""
         args = event.get_command_args()
-        if not args:
-            await event.reply("错误: 请指定适配器名称\n用法: /restart-adapter <适配器名>")
-            return
-        
-        adapter_name = args[0]
-        
-        if not self.sdk.adapter.exists(adapter_name):
-            await event.reply(f"未找到: 适配器 '{adapter_name}'")
+        measure = "--measure" in args
+        await self._adapter_batch_command(
+            event,
+            usage="/restart-adapter <适配器名...> | --all [--measure]",
+            action="重启",
+            select=lambda entry: entry["enabled"],
+            operation=self._measured_restart_one_adapter if measure else self._restart_one_adapter,
+            args=[arg for arg in args if arg != "--measure"],
+        )
+
+    def _probe_adapter(self, adapter_name):
+        """检查适配器是否在运行"""
+        is_running = getattr(self.sdk.adapter, "is_running", None)
+        if is_running is not None:
+            return bool(is_running(adapter_name))
+        return self.sdk.adapter.get(adapter_name) is not None
+
+    async def _watchdog_loop(self):
+        """适配器看门狗：按带抖动的间隔探测已启用的适配器，自动重启故障适配器"""
+        while True:
+            config = self.sdk.config.getConfig("AdminControl") or {}
+            interval = config.get("watchdog_interval", 30)
+            jitter = config.get("watchdog_jitter", 0.2)
+            await asyncio.sleep(interval * random.uniform(1 - jitter, 1 + jitter))
+            try:
+                await self._watchdog_probe(config)
+            except Exception as e:
+                self._log_error(f"适配器看门狗检查时出错: {e}")
+
+    async def _watchdog_probe(self, config):
+        """探测一轮适配器健康状态，对到达重试时间的故障适配器执行重启"""
+        now = time.monotonic()
+        to_restart = []
+        for adapter_name, enabled in self.sdk.adapter.list_items().items():
+            if not enabled or adapter_name in self._watchdog_paused:
+                continue
+            health = self._adapter_health.setdefault(adapter_name, AdapterHealth())
+            if self._probe_adapter(adapter_name):
+                if health.down_since is not None:
+                    health.mark_recovered(now)
+                    health.history.append((time.time(), True, "已自行恢复"))
+                continue
+            
+            if health.down_since is None:
+                self.logger.warning(f"适配器 {adapter_name} 未在运行，准备自动重启")
+            health.mark_down(now)
+            if health.breaker_open(now) or now < health.next_attempt:
+                continue
+            to_restart.append(adapter_name)
+        
+        if not to_restart:
             return
         
-        await event.reply(f"正在重启适配器 '{adapter_name}'...")
-        
-        try:
-            # 先停止
-            adapter_instance = self.sdk.adapter.get(adapter_name)
-            if adapter_instance:
-                await adapter_instance.shutdown()
+        results = await self._run_adapter_batch(to_restart, "重启", self._restart_one_adapter)
+        now = time.monotonic()
+        for adapter_name, ok, detail, _ in results:
+            health = self._adapter_health[adapter_name]
+            health.restarts += 1
+            if ok and self._probe_adapter(adapter_name):
+                health.mark_recovered(now)
+                health.history.append((time.time(), True, detail))
+                self.logger.info(f"适配器 {adapter_name} 已自动恢复")
+                continue
             
-            # 再启动
-            await self.sdk.adapter.startup([adapter_name])
-            await event.reply(f"成功: 适配器 '{adapter_name}' 已重启")
-        except Exception as e:
-            self.logger.error(f"重启适配器 {adapter_name} 时出错: {e}")
-            await event.reply(f"错误: {str(e)}")
+            health.history.append((time.time(), False, detail))
+            tripped = health.mark_failed(
+                now,
+                backoff_base=config.get("watchdog_backoff_base", 5),
+                backoff_max=config.get("watchdog_backoff_max", 300),
+                threshold=config.get("watchdog_failure_threshold", 5),
+                cooldown=config.get("watchdog_breaker_cooldown", 600),
+            )
+            if tripped:
+                self.logger.warning(f"适配器 {adapter_name} 连续 {health.failures} 次自动重启失败，已暂停自动重启")
+
+    def _health_lines(self, adapter_name):
+        """适配器自动恢复记录"""
+        health = self._adapter_health.get(adapter_name)
+        if health is None:
+            return []
+        
+        now = time.monotonic()
+        mttr = health.mttr
+        lines = []
+        lines.append(f"自动重启: {health.restarts} 次")
+        lines.append(f"平均恢复时间: {f'{mttr:.1f}s' if mttr is not None else '-'}")
+        if health.down_since is not None:
+            lines.append(f"已故障: {now - health.down_since:.0f}s，连续失败 {health.failures} 次")
+        if health.breaker_open(now):
+            lines.append(f"熔断中: {health.breaker_until - now:.0f}s 后恢复自动重启")
+        if health.history:
+            lines.append("最近记录:")
+            for at, ok, detail in reversed(health.history):
+                stamp = time.strftime("%m-%d %H:%M:%S", time.localtime(at))
+                lines.append(f"  {stamp} {'成功' if ok else '失败'} {detail}")
+        return lines
 
     async def _adapter_status(self, event):
         """查看适配器运行状态"""
-        from ErisPulse.finders import AdapterFinder
-        
         args = event.get_command_args()
-        finder = AdapterFinder()
+        registry = await self._get_registry()
         
         if args:
             # 查看单个适配器状态
@@ -858,10 +3893,11 @@ class Main(BaseModule):
                 await event.reply(f"未找到: 适配器 '{adapter_name}'")
                 return
             
-            adapter_info = finder.get_adapter_info(adapter_name)
-            version = adapter_info.get("version", "未知") if adapter_info else "未知"
+            entry = registry.adapters.get(adapter_name, {})
+            version = entry.get("version", "未知")
             is_enabled = self.sdk.adapter.is_enabled(adapter_name)
-            is_running = self.sdk.adapter.get(adapter_name) is not None
+            is_running = self._probe_adapter(adapter_name)
+            registry.update_adapter(adapter_name, enabled=is_enabled, running=is_running)
             
             lines = []
             lines.append(f"适配器: {adapter_name}")
@@ -869,24 +3905,25 @@ class Main(BaseModule):
             lines.append(f"版本: {version}")
             lines.append(f"已启用: {'是' if is_enabled else '否'}")
             lines.append(f"运行中: {'是' if is_running else '否'}")
+            lines.extend(self._health_lines(adapter_name))
         else:
             # 查看所有适配器状态
-            registered = finder.get_all_names()
-            items = self.sdk.adapter.list_items()
-            
             lines = []
             lines.append("适配器运行状态")
             lines.append("━━━━━")
             lines.append("")
             
-            for adapter_name in registered:
-                is_enabled = items.get(adapter_name, False)
-                is_running = self.sdk.adapter.get(adapter_name) is not None
-                
-                status = "运行中" if is_running else "已停止"
-                if not is_enabled:
+            for adapter_name, entry in registry.adapters.items():
+                status = "运行中" if entry["running"] else "已停止"
+                if not entry["enabled"]:
                     status = "已禁用"
                 
+                health = self._adapter_health.get(adapter_name)
+                if health is not None and health.restarts:
+                    mttr = health.mttr
+                    status += f"（自动重启 {health.restarts} 次"
+                    status += f"，平均恢复 {mttr:.1f}s）" if mttr is not None else "）"
+                
                 lines.append(f"{adapter_name}: {status}")
         
-        await event.reply("\n".join(lines))
+        await self._send_output(event, "\n".join(lines))
@@ -0,0 +1,9 @@
+"""
+AdminControl 离线性能基准
+
+使用模拟的 sdk 与事件驱动 Main 的命令处理器，无需启动机器人即可测量各命令的
+吞吐、延迟分位数与峰值内存。运行方式（需已安装 ErisPulse）：
+
+    python -m benchmarks.run
+    python -m benchmarks.run --admins 10000 --storage-keys 500000 --modules 300 --adapters 50
+"""
@@ -0,0 +1,301 @@
+"""
+模拟 sdk
+
+提供与 AdminControl 所用接口一致的 config / storage / module / adapter / logger，
+以及替代 ModuleFinder / AdapterFinder 的模拟 finder，规模均可配置。
+"""
+
+import asyncio
+import random
+from contextlib import contextmanager
+
+
+class FakeLogger:
+
+    def get_child(self, name):
+        return self
+
+    def debug(self, *args, **kwargs):
+        pass
+
+    def info(self, *args, **kwargs):
+        pass
+
+    def warning(self, *args, **kwargs):
+        pass
+
+    def error(self, *args, **kwargs):
+        pass
+
+
+class FakeConfig:
+    """与 sdk.config 一致按点分隔路径读写嵌套配置"""
+
+    def __init__(self, data=None):
+        self.data = data or {}
+
+    def getConfig(self, key, default=None):
+        node = self.data
+        for part in key.split("."):
+            if not isinstance(node, dict) or part not in node:
+                return default
+            node = node[part]
+        return node
+
+    def setConfig(self, key, value, immediate=False):
+        *parents, last = key.split(".")
+        node = self.data
+        for part in parents:
+            if not isinstance(node.get(part), dict):
+                node[part] = {}
+            node = node[part]
+        node[last] = value
+        return True
+
+
+class FakeStorage:
+
+    def __init__(self, data=None):
+        self.data = data or {}
+
+    def get(self, key, default=None):
+        return self.data.get(key, default)
+
+    def set(self, key, value):
+        self.data[key] = value
+        return True
+
+    def delete(self, key):
+        return self.data.pop(key, None) is not None
+
+    def get_all_keys(self):
+        return list(self.data)
+
+    def get_multi(self, keys):
+        return {key: self.data[key] for key in keys if key in self.data}
+
+    def set_multi(self, items):
+        self.data.update(items)
+        return True
+
+    def delete_multi(self, keys):
+        for key in keys:
+            self.data.pop(key, None)
+        return True
+
+
+class FakeModuleManager:
+
+    def __init__(self, names, latency):
+        self.enabled = {name: True for name in names}
+        self.loaded = set(names)
+        self.latency = latency
+
+    def list_loaded(self):
+        return list(self.loaded)
+
+    def exists(self, name):
+        return name in self.enabled
+
+    def is_loaded(self, name):
+        return name in self.loaded
+
+    def is_enabled(self, name):
+        return self.enabled.get(name, False)
+
+    def enable(self, name):
+        self.enabled[name] = True
+        return True
+
+    def disable(self, name):
+        self.enabled[name] = False
+        return True
+
+    async def load(self, name):
+        await asyncio.sleep(self.latency)
+        self.loaded.add(name)
+        return True
+
+    async def unload(self, name):
+        await asyncio.sleep(self.latency)
+        self.loaded.discard(name)
+        return True
+
+
+class FakeAdapterInstance:
+
+    def __init__(self, manager, name):
+        self.manager = manager
+        self.name = name
+
+    async def shutdown(self):
+        await asyncio.sleep(self.manager.latency / 4)
+        self.manager.running.discard(self.name)
+
+
+class FakeAdapterManager:
+
+    def __init__(self, names, latency):
+        self.items = {name: True for name in names}
+        self.running = set(names)
+        self.instances = {name: FakeAdapterInstance(self, name) for name in names}
+        self.latency = latency
+        self.emitted = 0
+
+    def list_items(self):
+        return dict(self.items)
+
+    def exists(self, name):
+        return name in self.items
+
+    def is_enabled(self, name):
+        return self.items.get(name, False)
+
+    def enable(self, name):
+        self.items[name] = True
+        return True
+
+    def disable(self, name):
+        self.items[name] = False
+        return True
+
+    def get(self, name):
+        # 与 sdk.adapter 一致：实例注册后始终可取，关闭后也不会变为 None
+        return self.instances.get(name)
+
+    def is_running(self, name):
+        return name in self.running
+
+    async def emit(self, data):
+        self.emitted += 1
+
+    async def startup(self, names):
+        # 模拟连接建立耗时（带抖动）
+        await asyncio.sleep(self.latency * random.uniform(0.5, 1.5))
+        self.running.update(names)
+
+
+class FakeSDK:
+    """
+    按规模生成的模拟 sdk
+
+    :param admins: 管理员 ID 数量
+    :param storage_keys: 存储键数量（均分到 user: / session: / cache: 三个命名空间）
+    :param modules: 模块数量，前 10% 作为被其余模块依赖的公共库
+    :param adapters: 适配器数量
+    :param adapter_latency: 适配器启动耗时（秒）
+    :param module_latency: 模块加载/卸载耗时（秒）
+    """
+
+    def __init__(self, admins=10_000, storage_keys=500_000, modules=300, adapters=50,
+                 adapter_latency=0.05, module_latency=0.001, config=None):
+        self.module_names = [f"Module{i:03d}" for i in range(modules)]
+        self.adapter_names = [f"adapter{i:02d}" for i in range(adapters)]
+        self.admin_ids = [str(100000 + i) for i in range(admins)]
+
+        self.logger = FakeLogger()
+        self.config = FakeConfig({
+            "AdminControl": {
+                "admins": list(self.admin_ids),
+                "reply_interval": 0,
+                **(config or {}),
+            },
+        })
+        namespaces = ("user", "session", "cache")
+        self.storage = FakeStorage({
+            f"{namespaces[i % 3]}:{i}": {"id": i, "name": f"name-{i}"}
+            for i in range(storage_keys)
+        })
+        self.module = FakeModuleManager(self.module_names, module_latency)
+        self.adapter = FakeAdapterManager(self.adapter_names, adapter_latency)
+
+
+class FakeEvent(dict):
+    """模拟命令事件，回复内容仅统计不输出"""
+
+    def __init__(self, args=(), user_id=None, group_id=None, platform="bench"):
+        super().__init__(user_id=user_id, group_id=group_id, platform=platform)
+        self.args = list(args)
+        self.replies = 0
+        self.reply_chars = 0
+
+    def get_command_args(self):
+        return list(self.args)
+
+    async def reply(self, text):
+        self.replies += 1
+        self.reply_chars += len(text)
+
+
+class FakeDistribution:
+
+    def __init__(self, name, version, requires):
+        self.name = name
+        self.version = version
+        self.requires = requires
+
+
+class FakeEntryPoint:
+
+    def __init__(self, name, dist):
+        self.name = name
+        self.dist = dist
+        self.module = f"{dist.name.replace('-', '_')}.Core"
+
+
+def _package_name(name):
+    return f"erispulse-{name.lower()}"
+
+
+def _make_finder(names, requires_of, info_key):
+
+    class FakeFinder:
+
+        def __init__(self):
+            self._entries = {
+                name: FakeEntryPoint(name, FakeDistribution(_package_name(name), "1.0.0", requires_of(name)))
+                for name in names
+            }
+
+        def get_all_names(self):
+            return list(self._entries)
+
+        def _info(self, name):
+            entry = self._entries.get(name)
+            if entry is None:
+                return None
+            return {
+                "name": name,
+                "entry_point": entry,
+                "package": entry.dist.name,
+                "version": entry.dist.version,
+            }
+
+    setattr(FakeFinder, info_key, FakeFinder._info)
+    return FakeFinder
+
+
+@contextmanager
+def fake_finders(sdk):
+    """在上下文内以模拟 finder 替换 ErisPulse.finders 中的 ModuleFinder / AdapterFinder"""
+    import ErisPulse.finders as finders
+
+    libraries = sdk.module_names[:max(1, len(sdk.module_names) // 10)]
+    library_of = {
+        name: libraries[i % len(libraries)]
+        for i, name in enumerate(sdk.module_names)
+        if name not in libraries
+    }
+
+    def module_requires(name):
+        if name in library_of:
+            return ["ErisPulse>=2.0", _package_name(library_of[name])]
+        return ["ErisPulse>=2.0"]
+
+    original = finders.ModuleFinder, finders.AdapterFinder
+    finders.ModuleFinder = _make_finder(sdk.module_names, module_requires, "get_module_info")
+    finders.AdapterFinder = _make_finder(sdk.adapter_names, lambda name: [], "get_adapter_info")
+    try:
+        yield
+    finally:
+        finders.ModuleFinder, finders.AdapterFinder = original
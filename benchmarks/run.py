@@ -0,0 +1,260 @@
+"""
+AdminControl 基准测试入口
+
+通过已注册的命令处理器（含权限检查与统计包装）驱动模拟流量，报告每个场景的
+吞吐、延迟分位数与峰值内存::
+
+    python -m benchmarks.run [--admins N] [--storage-keys N] [--modules N]
+                             [--adapters N] [--adapter-latency S]
+                             [--iterations N] [--suite 测试组...] [--only 场景名...]
+                             [--json 输出文件]
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from .fake_sdk import FakeEvent, FakeSDK, fake_finders
+
+ADMIN_ID = "100000"
+
+
+def percentile(samples, q):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(q * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def measure(name, operation, iterations):
+    """
+    执行场景并统计结果
+
+    先运行 iterations 次采集延迟，再在 tracemalloc 下运行一次采集峰值内存，
+    避免内存追踪的开销影响延迟数据。
+    """
+    samples = []
+    started = time.perf_counter()
+    for _ in range(iterations):
+        t0 = time.perf_counter()
+        await operation()
+        samples.append(time.perf_counter() - t0)
+    total = time.perf_counter() - started
+
+    tracemalloc.start()
+    try:
+        await operation()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "scenario": name,
+        "iterations": iterations,
+        "ops_per_sec": iterations / total if total else float("inf"),
+        "mean_ms": statistics.fmean(samples) * 1000,
+        "p50_ms": percentile(samples, 0.50) * 1000,
+        "p95_ms": percentile(samples, 0.95) * 1000,
+        "p99_ms": percentile(samples, 0.99) * 1000,
+        "peak_kib": peak / 1024,
+    }
+
+
+def command_operation(main, name, args=(), user_id=ADMIN_ID):
+    handler = main._command_handlers[name]
+
+    async def operation():
+        await handler(FakeEvent(args, user_id=user_id))
+
+    return operation
+
+
+async def bench_has_role(options):
+    """角色检查：管理员列表与角色规则数量增长时延迟应保持平稳"""
+    from ErisPulse_AdminControl.Core import Main
+
+    results = []
+    groups = ("module", "adapter", "config", "storage", "admin")
+    roles = ("viewer", "operator", "owner")
+    for admins in (0, 1_000, 100_000):
+        for size in (100, 1_000, 10_000, 100_000):
+            rules = [
+                {"role": roles[i % 3], "ids": [f"u{i}"], "command_groups": [groups[i % 5]],
+                 **({"group_id": f"g{i % 50}"} if i % 2 else {})}
+                for i in range(size)
+            ]
+            sdk = FakeSDK(admins=admins, storage_keys=0, modules=0, adapters=0, config={"roles": rules})
+            main = Main(sdk)
+            main.logger = sdk.logger
+            # 编译是一次性开销，不计入检查耗时
+            main._get_permissions()
+            # 有管理员时一半检查来自管理员列表，一半来自角色规则
+            events = [
+                FakeEvent(user_id=sdk.admin_ids[i % admins], group_id=f"g{i % 50}")
+                if admins and i % 2 else
+                FakeEvent(user_id=f"u{i % size}", group_id=f"g{i % 50}")
+                for i in range(options.iterations * 1000)
+            ]
+            cursor = iter(events)
+
+            async def operation():
+                main.has_role(next(cursor), "operator", "storage")
+
+            results.append(await measure(f"has_role[admins={admins},rules={size}]", operation, len(events) - 1))
+    return results
+
+
+async def bench_startup(options):
+    """on_load 耗时与到首个列表命令完成的耗时（eager / lazy 对比）"""
+    from ErisPulse_AdminControl.Core import Main
+
+    results = []
+    for mode in ("eager", "lazy"):
+        sdk = FakeSDK(
+            admins=options.admins, storage_keys=0, modules=options.modules,
+            adapters=options.adapters, config={"startup_mode": mode},
+        )
+        with fake_finders(sdk):
+            async def on_load():
+                main = Main(sdk)
+                await main.on_load({})
+                await main.on_unload({})
+
+            async def first_command():
+                main = Main(sdk)
+                await main.on_load({})
+                await command_operation(main, "list-all")()
+                await main.on_unload({})
+
+            results.append(await measure(f"startup[{mode}] on_load", on_load, options.startup_iterations))
+            results.append(await measure(f"startup[{mode}] first command", first_command, options.startup_iterations))
+    return results
+
+
+async def bench_commands(options):
+    """各命令在大规模数据下的表现"""
+    from ErisPulse_AdminControl.Core import Main, encode_cursor
+
+    sdk = FakeSDK(
+        admins=options.admins, storage_keys=options.storage_keys, modules=options.modules,
+        adapters=options.adapters, adapter_latency=options.adapter_latency,
+    )
+    iterations = options.iterations
+    # 指向键空间中部的续页令牌，与 --page 深翻页对比
+    keys = list(sdk.storage.data)
+    middle = len(keys) // 2
+    deep_cursor = encode_cursor(middle, keys[middle - 1]) if middle else encode_cursor(0, "")
+    results = []
+    with fake_finders(sdk):
+        main = Main(sdk)
+        await main.on_load({})
+        await main._get_registry()
+        try:
+            scenarios = [
+                ("list-modules", ("list-modules", ()), iterations),
+                ("list-adapters", ("list-adapters", ()), iterations),
+                ("list-all", ("list-all", ()), iterations),
+                ("adapter-status", ("adapter-status", ()), iterations),
+                ("list-storage", ("list-storage", ()), iterations),
+                ("list-storage prefix", ("list-storage", ("session:",)), iterations),
+                ("list-storage glob deep page", ("list-storage", ("user:*7", "--page", "50")), iterations),
+                ("list-storage glob deep cursor", ("list-storage", ("user:*7", "--cursor", deep_cursor)), iterations),
+                ("list-admins", ("list-admins", ()), iterations),
+                ("get-storage", ("get-storage", ("user:0",)), iterations),
+                ("restart-adapter --all", ("restart-adapter", ("--all",)), max(1, iterations // 10)),
+                ("reload-module --dependents", ("reload-module", ("--dependents", sdk.module_names[0])), max(1, iterations // 10)),
+            ]
+            for name, (command, args), count in scenarios:
+                if options.only and not any(pattern in name for pattern in options.only):
+                    continue
+                results.append(await measure(name, command_operation(main, command, args), count))
+        finally:
+            await main.on_unload({})
+    return results
+
+
+async def bench_storage(options):
+    """存储导出/导入：以 storage_keys 规模的存储完整导出再导入"""
+    from ErisPulse_AdminControl.Core import Main
+
+    sdk = FakeSDK(admins=1, storage_keys=options.storage_keys, modules=0, adapters=0)
+    main = Main(sdk)
+    main.logger = sdk.logger
+    await main.on_load({})
+    admin = sdk.admin_ids[0]
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        try:
+            for name, filename in (("jsonl", "dump.jsonl"), ("jsonl.gz", "dump.jsonl.gz")):
+                path = os.path.join(tmp, filename)
+                scenarios = [
+                    (f"export-storage {name}", "export-storage", (path,)),
+                    (f"import-storage {name} --dry-run", "import-storage", (path, "--dry-run")),
+                    (f"import-storage {name}", "import-storage", (path,)),
+                ]
+                for scenario, command, args in scenarios:
+                    if options.only and not any(pattern in scenario for pattern in options.only):
+                        continue
+                    result = await measure(scenario, command_operation(main, command, args, admin), 1)
+                    result["keys_per_sec"] = options.storage_keys / (result["mean_ms"] / 1000)
+                    results.append(result)
+        finally:
+            await main.on_unload({})
+    return results
+
+
+SUITES = {
+    "has_role": bench_has_role,
+    "startup": bench_startup,
+    "commands": bench_commands,
+    "storage": bench_storage,
+}
+
+
+def format_results(results):
+    header = f"{'场景':<36}{'次数':>8}{'ops/s':>12}{'p50(ms)':>10}{'p95(ms)':>10}{'p99(ms)':>10}{'峰值(KiB)':>12}"
+    lines = [header, "-" * len(header)]
+    for r in results:
+        lines.append(
+            f"{r['scenario']:<36}{r['iterations']:>8}{r['ops_per_sec']:>12.1f}"
+            f"{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['peak_kib']:>12.1f}"
+        )
+    return "\n".join(lines)
+
+
+async def run(options):
+    results = []
+    for name, suite in SUITES.items():
+        if options.suite and name not in options.suite:
+            continue
+        results.extend(await suite(options))
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="AdminControl 离线性能基准")
+    parser.add_argument("--admins", type=int, default=10_000)
+    parser.add_argument("--storage-keys", type=int, default=500_000)
+    parser.add_argument("--modules", type=int, default=300)
+    parser.add_argument("--adapters", type=int, default=50)
+    parser.add_argument("--adapter-latency", type=float, default=0.05)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--startup-iterations", type=int, default=20)
+    parser.add_argument("--suite", nargs="*", choices=sorted(SUITES), help="仅运行指定的测试组")
+    parser.add_argument("--only", nargs="*", help="仅运行名称包含指定字符串的命令场景")
+    parser.add_argument("--json", help="将结果以 JSON 写入指定文件，便于与历史结果对比")
+    options = parser.parse_args(argv)
+
+    results = asyncio.run(run(options))
+    print(format_results(results))
+    if options.json:
+        with open(options.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, ensure_ascii=False, indent=2)
+
+
+if __name__ == "__main__":
+    main()